@@ -1,7 +1,10 @@
 import streamlit as st
+import numpy as np
 import pandas as pd
 from pathlib import Path
-from utils.parser import load_file, clean_events, generate_summary
+from utils import filters
+from utils.parser import SERVER_LOG_ROOTS, generate_summary, server_log_paths
+from utils.parallel import combine_events, parse_files, parse_paths
 from utils.visuals import plot_timeline, plot_counts, draw_root_cause_diagram
 
 st.set_page_config(page_title="TSMC / Endpoint Log Analyzer — Multi-file Dashboard", layout="wide")
@@ -10,35 +13,46 @@ st.title("TSMC / Endpoint Log Analyzer — Multi-file Dashboard")
 
 # File uploader
 uploaded_files = st.file_uploader(
-    "Upload log file(s) (txt, log). You may upload multiple files.",
-    type=["txt", "log", "csv"],
+    "Upload log file(s) (txt, log, optionally .gz/.bz2/.xz compressed) or zip/tar bundles. You may upload multiple files.",
+    type=["txt", "log", "csv", "json", "ndjson", "jsonl", "xlsx", "xlsm", "pdf", "docx", "gz", "bz2", "xz", "zip", "tar", "tgz"],
     accept_multiple_files=True
 )
 
-# Load sample logs if none uploaded
-if not uploaded_files:
+# Logs already on the server are memory-mapped and read in place; only
+# files under the configured roots (LOG_ANALYZER_ROOTS) can be picked
+server_paths = st.text_input(f"Or analyze log file(s) on the server (path or glob pattern under {', '.join(SERVER_LOG_ROOTS)})")
+
+# Parse logs (one process-pool task per file); files parsed on an earlier
+# rerun come from the parse cache
+if uploaded_files:
+    results = parse_files(uploaded_files)
+elif server_paths:
+    paths = server_log_paths(server_paths)
+    if not paths:
+        st.warning(f"No files under {', '.join(SERVER_LOG_ROOTS)} match {server_paths}")
+    results = parse_paths(paths)
+else:
+    # Load sample logs if none uploaded
     st.info("No files uploaded — loading sample logs for demo.")
     sample_dir = Path("sample_logs")
-    uploaded_files = [open(f, "rb") for f in sample_dir.glob("*")]
-
-# Parse logs
-all_events = []
-for file in uploaded_files:
-    try:
-        df = load_file(file)
-        df["source_file"] = Path(file.name).name
-        all_events.append(df)
-    except Exception as e:
-        st.error(f"Failed to parse {file.name}: {e}")
-
-if all_events:
-    df_all = pd.concat(all_events, ignore_index=True)
-    cleaned_df = clean_events(df_all)
+    results = parse_paths(sorted(f for f in sample_dir.glob("*") if f.is_file()))
+
+parsed = []
+for name, key, result in results:
+    if isinstance(result, Exception):
+        st.error(f"Failed to parse {name}: {result}")
+        continue
+    parsed.append((name, key, result))
+
+if parsed:
+    cleaned_df, search_index = combine_events(parsed)
 
     # Sidebar filters
     st.sidebar.header("Filters")
 
-    if "Raise Date" in cleaned_df.columns and pd.api.types.is_datetime64_any_dtype(cleaned_df["Raise Date"]):
+    # type_events always gives Raise Date a datetime dtype; without any
+    # dates there is no range to offer and the filter is skipped
+    if "Raise Date" in cleaned_df.columns and pd.api.types.is_datetime64_any_dtype(cleaned_df["Raise Date"]) and cleaned_df["Raise Date"].notna().any():
         min_dt, max_dt = cleaned_df["Raise Date"].min(), cleaned_df["Raise Date"].max()
         date_range = st.sidebar.date_input("Date range (Raise Date)", [min_dt.date(), max_dt.date()])
         start_time = st.sidebar.time_input("Start time", value=pd.Timestamp("00:00").time())
@@ -57,32 +71,37 @@ if all_events:
     source_files = cleaned_df["source_file"].dropna().unique().tolist()
     selected_files = st.sidebar.multiselect("Choose source file(s)", source_files, default=source_files)
 
-    # Apply filters
-    df_filtered = cleaned_df.copy()
+    # Apply filters as one row mask over cleaned_df; string filters are
+    # evaluated once per distinct value (see utils.filters)
+    keep = np.ones(len(cleaned_df), dtype=bool)
 
-    if date_range and "Raise Date" in df_filtered.columns:
+    if date_range and "Raise Date" in cleaned_df.columns:
         start_dt = pd.to_datetime(str(date_range[0]) + " " + str(start_time))
         end_dt = pd.to_datetime(str(date_range[1]) + " " + str(end_time))
-        df_filtered = df_filtered[(df_filtered["Raise Date"] >= start_dt) & (df_filtered["Raise Date"] <= end_dt)]
+        keep &= ((cleaned_df["Raise Date"] >= start_dt) & (cleaned_df["Raise Date"] <= end_dt)).to_numpy()
 
     if selected_severity:
-        df_filtered = df_filtered[df_filtered["Severity"].isin(selected_severity)]
+        keep &= filters.isin(cleaned_df["Severity"], selected_severity)
 
-    if alarm_filter and "Alarm Name" in df_filtered.columns:
-        df_filtered = df_filtered[df_filtered["Alarm Name"].str.contains(alarm_filter, case=False, na=False)]
+    if alarm_filter and "Alarm Name" in cleaned_df.columns:
+        keep &= filters.contains(cleaned_df["Alarm Name"], alarm_filter, case=False)
 
     if keyword_filter:
-        df_filtered = df_filtered[df_filtered.apply(lambda row: row.astype(str).str.contains(keyword_filter, case=False, na=False).any(), axis=1)]
+        # Indexed search over Message, Alarm Name and Device Name: words must
+        # all match, "quoted phrases", OR, NOT / -word
+        keep &= search_index.search(keyword_filter)
 
     if selected_files:
-        df_filtered = df_filtered[df_filtered["source_file"].isin(selected_files)]
+        keep &= filters.isin(cleaned_df["source_file"], selected_files)
+
+    df_filtered = cleaned_df[keep]
 
     # Summary KPIs
     st.subheader("Summary of parsed files")
     col1, col2, col3, col4 = st.columns(4)
     col1.metric("Files processed", len(selected_files))
     col2.metric("Total parsed events", len(df_filtered))
-    col3.metric("Critical / Error events", len(df_filtered[df_filtered["Severity"].str.lower().isin(["critical", "error"])] if "Severity" in df_filtered.columns else []))
+    col3.metric("Critical / Error events", int(filters.isin(df_filtered["Severity"], ["critical", "error"], case=False).sum()) if "Severity" in df_filtered.columns else 0)
     col4.metric("Unique alarms", df_filtered["Alarm Name"].nunique() if "Alarm Name" in df_filtered.columns else 0)
 
     # Charts
@@ -0,0 +1,83 @@
+# tests/test_filters.py
+"""
+The filters in utils.filters against the pandas calls they stand for, on
+plain and categorical columns with missing values.
+"""
+
+import re
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from utils import filters
+
+VALUES = ["Critical", "critical", "ERROR", "Error 42", "warning", "Pump.3 failed", "pump[3]", "Überdruck", "überdruck", "", None, "a.b", "温度"]
+
+
+@pytest.fixture(params=["object", "str", "category"])
+def column(request):
+    values = pd.Series(VALUES * 3, dtype=object)
+    if request.param == "object":
+        return values
+    return values.astype(request.param)
+
+
+def plain(values):
+    return values.astype(object)
+
+
+def expected(mask):
+    return pd.Series(mask).fillna(False).to_numpy(dtype=bool)
+
+
+@pytest.mark.parametrize("pattern", ["crit", "Crit", "error", "pump.3", "pump[3]", r"\d+", "^u", "ÜBER", "", "温"])
+@pytest.mark.parametrize("case", [True, False])
+@pytest.mark.parametrize("regex", [True, False])
+def test_contains(column, pattern, case, regex):
+    got = filters.contains(column, pattern, case=case, regex=regex)
+    want = plain(column).str.contains(pattern, case=case, regex=regex, na=False)
+    assert (got == expected(want)).all()
+
+
+@pytest.mark.parametrize("pattern", ["crit", "^[A-Z]", r"\d", "ür", "a.b", "^$"])
+@pytest.mark.parametrize("case", [True, False])
+def test_matches(column, pattern, case):
+    got = filters.matches(column, pattern, case=case)
+    want = plain(column).str.contains(pattern, flags=0 if case else re.IGNORECASE, regex=True, na=False)
+    assert (got == expected(want)).all()
+
+
+@pytest.mark.parametrize("prefix", ["crit", "Crit", "ERR", "über", "", "温"])
+@pytest.mark.parametrize("case", [True, False])
+def test_startswith(column, prefix, case):
+    got = filters.startswith(column, prefix, case=case)
+    text = plain(column) if case else plain(column).str.lower()
+    want = text.str.startswith(prefix if case else prefix.lower(), na=False)
+    assert (got == expected(want)).all()
+
+
+@pytest.mark.parametrize("items", [["critical"], ["Critical", "ERROR"], ["error", "warning"], ["ÜBERDRUCK"], [""], [], ["missing"]])
+@pytest.mark.parametrize("case", [True, False])
+def test_isin(column, items, case):
+    got = filters.isin(column, items, case=case)
+    if case:
+        want = plain(column).isin(items)
+    else:
+        want = plain(column).str.lower().isin([item.lower() for item in items])
+    assert (got == expected(want)).all()
+
+
+def test_missing_never_matches(column):
+    missing = column.isna().to_numpy()
+    assert not filters.contains(column, "", regex=False)[missing].any()
+    assert not filters.matches(column, ".*")[missing].any()
+    assert not filters.startswith(column, "")[missing].any()
+    assert not filters.isin(column, ["None", "nan"])[missing].any()
+
+
+def test_unused_categories():
+    values = pd.Categorical(["info", None, "info"], categories=["critical", "info"])
+    assert filters.isin(values, ["critical"]).tolist() == [False, False, False]
+    assert filters.contains(values, "INF", case=False).tolist() == [True, False, True]
+    assert filters.isin(pd.Series([], dtype="category"), ["info"]).dtype == np.bool_
@@ -0,0 +1,258 @@
+# tests/test_parser_parity.py
+"""
+The columnar, bytes-level, streaming and split parsers against the
+original row-by-row parsers, kept below as the oracle: every path must
+give exactly the frame the old parser gives for the decoded lines.
+"""
+
+import gzip
+import io
+import random
+import re
+from functools import partial
+
+import pandas as pd
+import pytest
+
+from utils import bytes_parser, compression, parallel, parser
+
+# Small pieces so that even test-sized files span many blocks
+PIECE = 4096
+
+
+def legacy_parse_mcscript(lines):
+    events = []
+    for line in lines:
+        m = re.match(r"(\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2})\s+([IWEC])\s+.*?\s+(\S+)\s+(.*)", line)
+        if m:
+            ts, sev, src, msg = m.groups()
+            events.append({
+                "Raise Date": pd.to_datetime(ts, errors="coerce"),
+                "Severity": {"I": "Info", "W": "Warning", "E": "Error", "C": "Critical"}.get(sev, "Info"),
+                "Device Name": None,
+                "Alarm Name": src,
+                "Status": None,
+                "Message": msg.strip(),
+                "Terminated Date": None
+            })
+    return pd.DataFrame(events)
+
+
+def legacy_parse_tsmc(lines):
+    events = []
+    for line in lines:
+        ts_match = re.search(r"/(\d{8})/(\d{2}:\d{2}:\d{2}\.\d+)", line)
+        timestamp = None
+        if ts_match:
+            date_str, time_str = ts_match.groups()
+            try:
+                timestamp = pd.to_datetime(date_str + " " + time_str, format="%Y%m%d %H:%M:%S.%f")
+            except Exception:
+                timestamp = None
+        m = re.search(r"Alarm\s+([^\s]+)", line)
+        alarm = m.group(1) if m else None
+        if "Alarm" in line and "raised" in line.lower():
+            events.append({"Raise Date": timestamp, "Severity": "Warning", "Device Name": None, "Alarm Name": alarm,
+                           "Status": "Raised", "Message": line.strip(), "Terminated Date": None})
+        elif "Alarm" in line and "terminated" in line.lower():
+            events.append({"Raise Date": None, "Severity": "Info", "Device Name": None, "Alarm Name": alarm,
+                           "Status": "Terminated", "Message": line.strip(), "Terminated Date": timestamp})
+        else:
+            events.append({"Raise Date": timestamp, "Severity": "Info", "Device Name": None, "Alarm Name": None,
+                           "Status": None, "Message": line.strip(), "Terminated Date": None})
+    return pd.DataFrame(events)
+
+
+def legacy_parse_generic(lines):
+    events = []
+    for line in lines:
+        ts = None
+        m = re.match(r"(\d{4}[-/]\d{2}[-/]\d{2}[ T]\d{2}:\d{2}:\d{2})", line)
+        if m:
+            try:
+                ts = pd.to_datetime(m.group(1))
+            except Exception:
+                ts = None
+        events.append({"Raise Date": ts, "Severity": None, "Device Name": None, "Alarm Name": None,
+                       "Status": None, "Message": line.strip(), "Terminated Date": None})
+    return pd.DataFrame(events)
+
+
+# Stamps the fixed-width decoder must reject or hand to pandas exactly like the old parser
+TSMC_EDGE_STAMPS = [
+    "20240229/10:00:00.5", "20230229/10:00:00.5", "20241231/23:59:60.0", "20240100/10:00:00.0",
+    "20241301/10:00:00.0", "20240101/24:00:00.0", "20240101/10:00:00.123456789", "20240101/10:00:00.1234567891",
+    "00010101/00:00:00.0", "99991231/23:59:59.9", "16770921/00:12:43.145224", "16770921/00:12:43.145225",
+    "22620411/23:47:16.854775", "22620411/23:47:16.854776", "21000229/10:00:00.0", "20000229/10:00:00.0",
+]
+# Non-ASCII text and characters str.splitlines breaks lines at but bytes do not
+ODD_TEXT = ["café", "Ä1", " ", "\x0b tail", "\x1c", "\x85", " ", "\t"]
+
+
+def tsmc_lines(n, seed):
+    r = random.Random(seed)
+    lines = []
+    for i in range(n):
+        stamp = r.choice(TSMC_EDGE_STAMPS) if r.random() < 0.1 else (
+            f"2024{r.randint(1, 12):02d}{r.randint(1, 28):02d}/{r.randint(0, 23):02d}:{r.randint(0, 59):02d}:"
+            f"{r.randint(0, 59):02d}.{r.randint(0, 999999):0{r.randint(1, 9)}d}")
+        kind = r.random()
+        if kind < 0.2:
+            line = f"  Alarm ALM{r.randint(1, 300)} has been raised on unit /{stamp}"
+        elif kind < 0.35:
+            line = f"Alarm\tALM{r.randint(1, 300)} has been TERMINATED /{stamp} "
+        elif kind < 0.4:
+            line = r.choice(["Alarms raised here", "Alarm  raised", "AlarmX terminated", "", " "])
+        else:
+            line = f"process step {i} ok /{stamp}"
+        if r.random() < 0.05:
+            line += " " + r.choice(ODD_TEXT)
+        lines.append(line)
+    return lines
+
+
+def mcscript_lines(n, seed):
+    r = random.Random(seed)
+    tokens = ["agent", "mfemactl", "[123]", "Scan", "x", "ePO:", "café", "long" * 20]
+    lines = []
+    for _ in range(n):
+        stamp = r.choice(["2024-02-29 10:00:00", "2023-02-29 10:00:00", "2024-01-01 10:00:60", "2024-13-40 10:00:00"]) \
+            if r.random() < 0.05 else f"2024-{r.randint(1, 12):02d}-{r.randint(1, 28):02d} " \
+            f"{r.randint(0, 23):02d}:{r.randint(0, 59):02d}:{r.randint(0, 59):02d}"
+        blank = r.choice([" ", "  ", "\t", " \t "])
+        body = blank.join(r.choice(tokens) for _ in range(r.randint(0, 5)))
+        line = stamp + r.choice([" ", "  "]) + r.choice("IWECXi") + r.choice([" ", "  ", "\t"]) + body + r.choice(["", " ", "  "])
+        if r.random() < 0.05:
+            line = r.choice(["garbage line ", r.choice(ODD_TEXT)]) + line
+        lines.append(line)
+    return lines
+
+
+def generic_lines(n, seed):
+    r = random.Random(seed)
+    lines = []
+    for _ in range(n):
+        stamp = f"2024-{r.randint(1, 12):02d}-{r.randint(1, 28):02d} {r.randint(0, 23):02d}:{r.randint(0, 59):02d}:{r.randint(0, 59):02d}"
+        kind = r.random()
+        if kind < 0.05:
+            stamp = stamp.replace("-", "/")
+        elif kind < 0.1:
+            stamp = stamp.replace(" ", "T")
+        elif kind < 0.15:
+            stamp = r.choice(["2024-01-01 10:00:60", "2024-02-29 10:00:00", "2023-02-29 10:00:00", "2024/13/02 10:00:00",
+                              "2024-01/02 10:00:00", "0001-01-01 00:00:00", "9999-12-31 23:59:59", "no stamp"])
+        lines.append(stamp + r.choice([" msg here ", "  x", "", " " + r.choice(ODD_TEXT)]))
+    return lines
+
+
+FORMATS = {
+    "tsmc": (tsmc_lines, legacy_parse_tsmc, "unit.tsmc.log"),
+    "mcscript": (mcscript_lines, legacy_parse_mcscript, "mcafee_agent.log"),
+    "generic": (generic_lines, legacy_parse_generic, "server.log"),
+}
+SEPARATORS = ["\n", "\r\n", "\r"]
+
+
+def log_bytes(fmt, seed, sep="\n", n=2000):
+    """A generated log of format `fmt`, with a random ending and stray invalid UTF-8."""
+    make = FORMATS[fmt][0]
+    r = random.Random(seed)
+    data = sep.join(make(n, seed)).encode() + r.choice([b"", b"\n", b"\r\n", b"\x0b\n"])
+    return data.replace(b"ok", b"o\xffk", 3)
+
+
+def oracle(fmt, data):
+    return FORMATS[fmt][1](data.decode(errors="ignore").splitlines())
+
+
+def named_buffer(fmt, data, suffix=""):
+    buffer = io.BytesIO(data)
+    buffer.name = FORMATS[fmt][2] + suffix
+    return buffer
+
+
+@pytest.fixture
+def small_pieces(monkeypatch):
+    """Force the streaming and split paths onto test-sized files."""
+    monkeypatch.setattr(parser, "STREAM_THRESHOLD", 0)
+    monkeypatch.setattr(parser, "STREAM_BLOCK_SIZE", PIECE)
+    monkeypatch.setattr(parser, "iter_file_chunks", partial(parser.iter_file_chunks, block_size=PIECE))
+    monkeypatch.setattr(compression, "iter_decompressed", partial(compression.iter_decompressed, block_size=PIECE))
+    monkeypatch.setattr(parallel, "SPLIT_MIN_PIECE", PIECE)
+    # The pool is only used with several workers; make sure it is here
+    monkeypatch.setattr(parallel, "POOL_WORKERS", max(parallel.POOL_WORKERS, 2))
+
+
+@pytest.mark.parametrize("seed", range(3))
+@pytest.mark.parametrize("fmt", FORMATS)
+def test_line_parsers(fmt, seed):
+    make, legacy, _ = FORMATS[fmt]
+    lines = make(3000, seed)
+    pd.testing.assert_frame_equal(getattr(parser, f"parse_{fmt}")(lines), legacy(lines))
+
+
+@pytest.mark.parametrize("fmt", FORMATS)
+@pytest.mark.parametrize("lines", [[], [""], [" "], ["x"], ["Alarm A raised"], ["2024-01-01 10:00:00 I  a"]])
+def test_line_parsers_tiny(fmt, lines):
+    pd.testing.assert_frame_equal(getattr(parser, f"parse_{fmt}")(lines), FORMATS[fmt][1](lines))
+
+
+@pytest.mark.parametrize("seed", range(2))
+@pytest.mark.parametrize("sep", SEPARATORS)
+@pytest.mark.parametrize("fmt", ["tsmc", "mcscript"])
+def test_bytes_parsers(fmt, sep, seed):
+    data = log_bytes(fmt, seed, sep)
+    parse = getattr(bytes_parser, f"parse_{fmt}_bytes")
+    pd.testing.assert_frame_equal(parse(data), oracle(fmt, data))
+
+
+@pytest.mark.parametrize("sep", SEPARATORS)
+@pytest.mark.parametrize("fmt", FORMATS)
+def test_load_file(fmt, sep):
+    data = log_bytes(fmt, 7, sep)
+    pd.testing.assert_frame_equal(parser.load_file(named_buffer(fmt, data), parallel=False), oracle(fmt, data))
+
+
+@pytest.mark.parametrize("sep", SEPARATORS)
+@pytest.mark.parametrize("fmt", FORMATS)
+def test_streaming(fmt, sep, small_pieces):
+    data = log_bytes(fmt, 11, sep)
+    pd.testing.assert_frame_equal(parser.load_file(named_buffer(fmt, data), parallel=False), oracle(fmt, data))
+
+
+@pytest.mark.parametrize("fmt", FORMATS)
+def test_streaming_path(fmt, small_pieces, tmp_path):
+    data = log_bytes(fmt, 13, "\r\n")
+    path = tmp_path / FORMATS[fmt][2]
+    path.write_bytes(data)
+    pd.testing.assert_frame_equal(parser.load_path(path, parallel=False), oracle(fmt, data))
+
+
+@pytest.mark.parametrize("sep", SEPARATORS)
+@pytest.mark.parametrize("fmt", FORMATS)
+def test_split(fmt, sep, small_pieces, monkeypatch, tmp_path):
+    monkeypatch.setattr(parser, "SPLIT_THRESHOLD", 0)
+    data = log_bytes(fmt, 17, sep)
+    expected = oracle(fmt, data)
+    pd.testing.assert_frame_equal(parser.load_file(named_buffer(fmt, data)), expected)
+    path = tmp_path / FORMATS[fmt][2]
+    path.write_bytes(data)
+    pd.testing.assert_frame_equal(parser.load_path(path), expected)
+
+
+def test_split_single_worker(small_pieces, monkeypatch):
+    # With one worker the pool only adds pickling; large files are parsed in place
+    monkeypatch.setattr(parser, "SPLIT_THRESHOLD", 0)
+    monkeypatch.setattr(parallel, "POOL_WORKERS", 1)
+    monkeypatch.setattr(parallel, "get_pool", lambda: pytest.fail("the pool was used"))
+    data = log_bytes("tsmc", 23)
+    pd.testing.assert_frame_equal(parser.load_file(named_buffer("tsmc", data)), oracle("tsmc", data))
+    assert parallel._parse_files([named_buffer("tsmc", data), named_buffer("mcscript", data)])
+
+
+@pytest.mark.parametrize("parallel", [False, True])
+@pytest.mark.parametrize("fmt", FORMATS)
+def test_compressed_streaming(fmt, parallel, small_pieces):
+    data = log_bytes(fmt, 19, "\r\n")
+    buffer = named_buffer(fmt, gzip.compress(data), ".gz")
+    pd.testing.assert_frame_equal(parser.load_file(buffer, parallel=parallel), oracle(fmt, data))
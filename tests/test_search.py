@@ -0,0 +1,96 @@
+# tests/test_search.py
+"""
+SearchIndex.search against a brute-force scan: a term matches a row when
+it is a lowercase substring of any of the searched columns.
+"""
+
+import random
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from utils.search import SEARCH_COLUMNS, SearchIndex, parse_query
+
+WORDS = [
+    "Alarm", "alarm12", "a12", "A1", "x", "DEVICE-7", "dev", "Pump", "pump_3", "Überdruck", "straße", "ÉCHEC",
+    "温度", "温度过高", "Ωmega", "İstanbul", "ǅemal", "/var/log/app.log", "0xdeadbeef" * 4, "a", "e",
+]
+BLANKS = [" ", "  ", "\t", "\xa0", "　"]
+
+
+def brute_force(df, query):
+    text = [df[col].astype(object).where(df[col].notna(), None) for col in SEARCH_COLUMNS if col in df.columns]
+    mask = np.zeros(len(df), dtype=bool)
+    for clause in parse_query(query):
+        found = np.ones(len(df), dtype=bool)
+        for term, negated in clause:
+            rows = np.array([any(value is not None and term in str(value).lower() for value in values) for values in zip(*text)], dtype=bool)
+            found &= ~rows if negated else rows
+        mask |= found
+    return mask
+
+
+def sentence(rng):
+    words = rng.sample(WORDS, rng.randint(1, 4))
+    text = words[0]
+    for word in words[1:]:
+        text += rng.choice(BLANKS) + word
+    return text
+
+
+@pytest.fixture(scope="module")
+def events():
+    rng = random.Random(7)
+    n = 400
+    df = pd.DataFrame({
+        "Message": [None if rng.random() < 0.1 else sentence(rng) for _ in range(n)],
+        "Alarm Name": pd.Categorical([None if rng.random() < 0.1 else rng.choice(WORDS) for _ in range(n)]),
+        "Device Name": pd.Categorical([None if rng.random() < 0.2 else rng.choice(WORDS[:8]) for _ in range(n)]),
+        "Severity": "info",
+    })
+    return df, SearchIndex(df)
+
+
+QUERIES = [
+    # Plain terms, any case
+    "alarm", "ALARM12", "pump", "device-7", "/var/log", "deadbeef", "log/app", "nomatch",
+    # Short terms, below the trigram length
+    "a", "x", "a1", "12", "-", "e",
+    # Non-ASCII
+    "über", "ÜBERDRUCK", "straße", "échec", "温度", "度过", "ωmega", "istanbul", "i̇stanbul", "ǆemal",
+    # Quoted phrases, blanks included
+    '"a12 "', '" a12"', '"alarm12 pump"', '"pump  alarm"', '"x\tdev"', '"a"', '"  "', '"unterminated',
+    # OR
+    "pump OR dev", "温度 OR a12", "x OR", "OR", "nomatch OR straße",
+    # NOT and -term
+    "-pump", "NOT pump", "alarm -a12", "alarm NOT a12", "-x -e", '-"alarm12 pump"', "NOT", "-",
+    # Combinations
+    "alarm pump OR -dev x", '"a12 " OR NOT 温度', "", "   ",
+]
+
+
+@pytest.mark.parametrize("query", QUERIES)
+def test_search_matches_brute_force(events, query):
+    df, index = events
+    assert (index.search(query) == brute_force(df, query)).all()
+
+
+def test_random_terms(events):
+    df, index = events
+    rng = random.Random(3)
+    text = " ".join(str(value) for col in SEARCH_COLUMNS for value in df[col].dropna())
+    for _ in range(200):
+        start = rng.randrange(len(text))
+        term = text[start:start + rng.randint(1, 8)]
+        query = '"' + term.replace('"', "") + '"'
+        assert (index.search(query) == brute_force(df, query)).all(), query
+
+
+def test_missing_columns():
+    df = pd.DataFrame({"Message": ["Pump failed", None, "pump ok"]})
+    index = SearchIndex(df)
+    assert index.search("pump").tolist() == [True, False, True]
+    assert index.search("-pump").tolist() == [False, True, False]
+    assert SearchIndex(pd.DataFrame({"Severity": ["info"]})).search("info").tolist() == [False]
+    assert SearchIndex(df.iloc[:0]).search("pump").tolist() == []
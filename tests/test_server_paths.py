@@ -0,0 +1,75 @@
+# tests/test_server_paths.py
+"""
+server_log_paths must only ever return files inside the configured roots,
+whatever the pattern or the symlinks under a root point to.
+"""
+
+import os
+
+import pytest
+
+from utils.parser import server_log_paths
+
+
+@pytest.fixture
+def tree(tmp_path):
+    tmp_path = tmp_path.resolve()
+    root = tmp_path / "logs"
+    (root / "day").mkdir(parents=True)
+    (root / "a.log").write_text("inside\n")
+    (root / "day" / "b.log").write_text("inside\n")
+    outside = tmp_path / "secret"
+    outside.mkdir()
+    (outside / "c.log").write_text("outside\n")
+    (tmp_path / "d.log").write_text("outside\n")
+    return root, outside
+
+
+def test_relative_patterns(tree):
+    root, _ = tree
+    assert server_log_paths("a.log", [root]) == [root / "a.log"]
+    assert server_log_paths("*/*.log", [root]) == [root / "day" / "b.log"]
+    assert server_log_paths("day/../a.log", [root]) == [root / "a.log"]
+    assert server_log_paths("day", [root]) == []
+    assert server_log_paths("  ", [root]) == []
+    assert server_log_paths("a.log", []) == []
+
+
+@pytest.mark.parametrize("pattern", ["../d.log", "../*.log", "../secret/c.log", "../secret/*", "day/../../d.log", "../*/c.log"])
+def test_parent_escapes(tree, pattern):
+    root, _ = tree
+    assert server_log_paths(pattern, [root]) == []
+
+
+def test_absolute_patterns(tree):
+    root, outside = tree
+    assert server_log_paths(str(root / "*.log"), [root]) == [root / "a.log"]
+    assert server_log_paths(str(outside / "c.log"), [root]) == []
+    assert server_log_paths(str(outside.parent / "*.log"), [root]) == []
+    assert server_log_paths(str(root / ".." / "d.log"), [root]) == []
+    # The roots only limit what is returned, not where the pattern looks
+    assert server_log_paths(str(outside.parent / "*" / "*.log"), [root]) == [root / "a.log"]
+
+
+@pytest.mark.skipif(not hasattr(os, "symlink"), reason="needs symlinks")
+def test_symlinks(tree):
+    root, outside = tree
+    try:
+        (root / "link.log").symlink_to(outside / "c.log")
+        (root / "linked").symlink_to(outside, target_is_directory=True)
+        (root / "alias.log").symlink_to(root / "day" / "b.log")
+    except OSError:
+        pytest.skip("symlinks not permitted")
+    assert server_log_paths("link.log", [root]) == []
+    assert server_log_paths("linked/*", [root]) == []
+    assert server_log_paths(str(root / "linked" / "c.log"), [root]) == []
+    # A link to a file inside a root resolves to that file, listed once
+    assert server_log_paths("*.log", [root]) == [root / "a.log", root / "day" / "b.log"]
+    assert server_log_paths("*/*.log", [root]) == [root / "day" / "b.log"]
+    assert server_log_paths("alias.log", [root]) == [root / "day" / "b.log"]
+
+
+def test_several_roots(tree):
+    root, outside = tree
+    assert server_log_paths("*.log", [root, outside]) == [root / "a.log", outside / "c.log"]
+    assert server_log_paths("../d.log", [root, outside]) == []
@@ -0,0 +1,127 @@
+# utils/archive.py
+
+import tarfile
+import zipfile
+from itertools import chain
+from pathlib import PurePosixPath
+
+from utils import compression, registry
+from utils.parser import STREAM_BLOCK_SIZE, concat_events, iter_newline_pieces, parse_buffer
+
+ZIP_MAGICS = (b"PK\x03\x04", b"PK\x05\x06")
+# "ustar" sits at this offset of the first tar header (POSIX and GNU)
+TAR_MAGIC_OFFSET = 257
+TAR_MAGIC = b"ustar"
+TAR_HEAD = TAR_MAGIC_OFFSET + len(TAR_MAGIC)
+# Office documents are zip packages too; they are parsed as documents
+OFFICE_MARKER = "[Content_Types].xml"
+
+
+def detect(file):
+    """
+    "zip" or "tar" when `file` is an archive (tar possibly gzip, bzip2 or
+    xz compressed), else None. The file is rewound.
+    """
+    head = registry.peek(file, TAR_HEAD)
+    opener = compression.detect(head)
+    if not opener:
+        kind = detect_head(head)
+        return None if kind == "zip" and is_office(file) else kind
+    pos = file.tell()
+    try:
+        with opener(file) as stream:
+            head = stream.read(TAR_HEAD)
+    except Exception:
+        return None
+    finally:
+        file.seek(pos)
+    return "tar" if detect_head(head) == "tar" else None
+
+
+def detect_head(head):
+    """
+    Archive kind ("zip", "tar" or None) from the first TAR_HEAD bytes of an
+    uncompressed file. Office documents also look like zip here.
+    """
+    if head.startswith(ZIP_MAGICS):
+        return "zip"
+    if head[TAR_MAGIC_OFFSET:TAR_HEAD] == TAR_MAGIC:
+        return "tar"
+    return None
+
+
+def is_office(file):
+    """Whether a zip file is an Office document package; the file is rewound."""
+    pos = file.tell()
+    try:
+        with zipfile.ZipFile(file) as bundle:
+            return OFFICE_MARKER in bundle.namelist()
+    except zipfile.BadZipFile:
+        return False
+    finally:
+        file.seek(pos)
+
+
+def load_archive(file, kind, parallel=True):
+    """
+    Parse every regular member of a zip or tar archive. Members are read as
+    streams straight out of the archive, never extracted to disk; each one
+    gets its own format (compressed members are decompressed on the fly)
+    and is cut into newline-aligned blocks that are parsed across the
+    process pool when `parallel` is set. Each event's source_file is the
+    member's name.
+    """
+    names = []
+
+    def pieces():
+        for name, stream in iter_members(file, kind):
+            for spec, piece in iter_member_pieces(name, stream):
+                names.append(name)
+                yield spec, piece
+
+    if parallel:
+        from utils.parallel import parse_pieces
+        frames = parse_pieces(pieces())
+    else:
+        frames = (parse_buffer(spec, piece) for spec, piece in pieces())
+    return concat_events([df.assign(source_file=name) for df, name in zip(frames, names)])
+
+
+def iter_members(file, kind):
+    """
+    (name, stream) for every regular member, in archive order. A tar is
+    read in stream mode, so each stream is only valid until the next
+    member is requested.
+    """
+    if kind == "zip":
+        with zipfile.ZipFile(file) as bundle:
+            for info in bundle.infolist():
+                if not info.is_dir():
+                    with bundle.open(info) as stream:
+                        yield info.filename, stream
+        return
+    with tarfile.open(fileobj=file, mode="r|*") as bundle:
+        for member in bundle:
+            if member.isfile():
+                yield member.name, bundle.extractfile(member)
+
+
+def iter_member_pieces(name, stream, block_size=STREAM_BLOCK_SIZE):
+    """
+    (spec, piece) pairs for one archive member: its newline-aligned blocks
+    of about `block_size` bytes, with the format sniffed from the first.
+    """
+    opener = compression.detect(stream.peek(compression.MAGIC_BYTES)[:compression.MAGIC_BYTES])
+    if opener:
+        stream = opener(stream)
+        name = compression.COMPRESSED_SUFFIX_RE.sub("", name)
+    pieces = iter_newline_pieces(stream, block_size)
+    first = next(pieces, b"")
+    spec = registry.sniff(first[:registry.SNIFF_BYTES], PurePosixPath(name).name)
+    if spec.file_target:
+        # A header or container cannot be cut apart: one piece per member
+        yield spec, b"".join(chain([first], pieces))
+        return
+    yield spec, first
+    for piece in pieces:
+        yield spec, piece
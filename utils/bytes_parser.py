@@ -0,0 +1,186 @@
+# utils/bytes_parser.py
+
+import re
+
+import numpy as np
+import pandas as pd
+
+from utils import scan
+from utils.parser import (
+    SEVERITY_CODES, concat_events, mcscript_events,
+    parse_mcscript, parse_mcscript_rows, parse_tsmc, tsmc_column, tsmc_events,
+)
+from utils.timestamps import STAMP_CACHE, TSMC_STAMP_FORMAT, decode_tsmc_stamps, stamp_column
+
+# Past this share of non-ASCII lines the text path is cheaper
+DIRTY_LIMIT = 0.2
+
+TSMC_ALARM_BYTES_RE = re.compile(rb"Alarm\s+(\S+)")
+
+# Same grammar as MCSCRIPT_RE, anchored at line starts and with every class
+# kept inside one line. The alternatives are the two layouts mcscript_layout
+# keeps: "<sev> <module> <source> <message>", else a wide lead before
+# "<source> <message word>"; only the stamp, severity, source and message
+# are captured
+MCSCRIPT_BYTES_RE = re.compile(
+    rb"(?:\A|(?<=[\r\n]))(\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2})[ \t]+([IWEC])"
+    rb"(?:[ \t]+[^\s]+[ \t]+([^\s]+)[ \t]+([^\r\n]*)|[ \t][ \t]+([^\s]+)[ \t]+([^\s]*))"
+)
+SEVERITY_BYTE_CODES = {code.encode(): i for i, code in enumerate(SEVERITY_CODES)}
+
+
+def parse_tsmc_bytes(data):
+    """
+    Bytes-level TSMC parser. Literal scans over the raw buffer find the
+    candidate stamp and alarm offsets, full extraction runs only at those
+    candidates, and only the kept fields (stamp, alarm name, message) are
+    decoded. Lines with non-ASCII bytes go through parse_tsmc so the
+    result is the same as decoding the whole file.
+    """
+    starts, ends = scan.line_bounds(data)
+    if not len(starts):
+        return pd.DataFrame()
+    dirty = scan.dirty_lines(data, starts)
+    if dirty.mean() > DIRTY_LIMIT:
+        return parse_tsmc(str(data, "utf-8", "ignore").splitlines())
+
+    # Phase one: literal scans for the "/YYYYMMDD/" marker and "Alarm".
+    # Phase two: full extraction only at those candidates. The stamp is
+    # TSMC_STAMP_RE checked column-wise: the first marker per line followed
+    # by "HH:MM:SS." and at least one fraction digit.
+    marks = scan.keep_shape(data, scan.stamp_markers(data), "##:##:##.#", start=10)
+    owner, first = np.unique(scan.line_index(starts, marks), return_index=True)
+    marks = marks[first]
+    fraction = scan.digit_run(data, marks + 19)
+
+    raised = np.zeros(len(starts), dtype=bool)
+    terminated = np.zeros(len(starts), dtype=bool)
+    alarm = np.full(len(starts), None, dtype=object)
+    # "raised"/"terminated" only matter on lines that mention "Alarm"
+    for i in np.unique(scan.line_index(starts, scan.find_all(data, b"Alarm"))).tolist():
+        line = data[starts[i]:ends[i]]
+        lowered = line.lower()
+        raised[i] = lowered.find(b"raised") != -1
+        terminated[i] = not raised[i] and lowered.find(b"terminated") != -1
+        if raised[i] or terminated[i]:
+            m = TSMC_ALARM_BYTES_RE.search(line)
+            alarm[i] = m.group(1).decode() if m else None
+
+    clean = np.flatnonzero(~dirty)
+    message = np.array([data[s:e].strip().decode() for s, e in zip(starts[clean].tolist(), ends[clean].tolist())], dtype=object)
+    raise_date, terminated_date = _tsmc_dates(data, len(starts), owner, marks, fraction, terminated)
+    df = tsmc_events(raise_date[clean], terminated_date[clean], raised[clean], terminated[clean], alarm[clean], message)
+    if len(clean) == len(starts):
+        return df
+    return _merge_dirty(df, clean, data, starts, ends, dirty, _parse_tsmc_rows)
+
+
+def parse_mcscript_bytes(data):
+    """
+    Bytes-level McScript parser: one pass of MCSCRIPT_BYTES_RE over the raw
+    buffer, decoding only the stamp, source and message of each match.
+    Lines with non-ASCII bytes go through parse_mcscript.
+    """
+    starts, ends = scan.line_bounds(data)
+    if not len(starts):
+        return pd.DataFrame()
+    dirty = scan.dirty_lines(data, starts)
+    if dirty.mean() > DIRTY_LIMIT:
+        return parse_mcscript(str(data, "utf-8", "ignore").splitlines())
+
+    positions, ts, codes, alarm, message = [], [], [], [], []
+    for m in MCSCRIPT_BYTES_RE.finditer(data):
+        stamp, sev, full_alarm, rest, short_alarm, second = m.groups()
+        positions.append(m.start())
+        ts.append(stamp.decode())
+        codes.append(SEVERITY_BYTE_CODES[sev])
+        if full_alarm is None:
+            alarm.append(short_alarm.decode())
+            message.append(second.decode())
+        else:
+            alarm.append(full_alarm.decode())
+            message.append(rest.strip().decode())
+
+    rows = scan.line_index(starts, np.array(positions, dtype=np.int64))
+    keep = ~dirty[rows]
+    if keep.any():
+        df = mcscript_events(
+            np.array(ts, dtype=object)[keep], np.array(codes, dtype=np.int8)[keep],
+            np.array(alarm, dtype=object)[keep], np.array(message, dtype=object)[keep],
+        )
+    else:
+        df = pd.DataFrame()
+    rows = rows[keep]
+    if not dirty.any():
+        return df
+    return _merge_dirty(df, rows, data, starts, ends, dirty, parse_mcscript_rows)
+
+
+def _tsmc_dates(data, count, owner, marks, fraction, terminated):
+    """
+    Raise Date and Terminated Date for `count` lines, decoded in place by
+    the fixed-width kernel. A column holding a stamp the kernel refuses
+    but pandas accepts (a leap second, an out-of-range year) is parsed
+    from its text instead, so odd values come out as in parse_tsmc.
+    """
+    nanos, valid = decode_tsmc_stamps(data, marks, fraction)
+    accepted = np.zeros(len(marks), dtype=bool)
+    refused = np.flatnonzero(~valid)
+    if len(refused):
+        text = _stamp_text(data, marks[refused], fraction[refused])
+        # One by one: in a single call a nanosecond fraction would make
+        # pandas refuse years that parse on their own
+        accepted[refused] = pd.notna(STAMP_CACHE.get_many(text, TSMC_STAMP_FORMAT))
+
+    columns = []
+    for rows in (~terminated[owner], terminated[owner]):
+        if accepted[rows].any():
+            stamp = np.full(count, None, dtype=object)
+            stamp[owner[rows]] = _stamp_text(data, marks[rows], fraction[rows])
+            columns.append(tsmc_column(pd.Series(stamp, dtype=object)))
+            continue
+        line_nanos = np.zeros(count, dtype=np.int64)
+        line_digits = np.zeros(count, dtype=np.int64)
+        line_valid = np.zeros(count, dtype=bool)
+        line_nanos[owner[rows]] = nanos[rows]
+        line_digits[owner[rows]] = fraction[rows]
+        line_valid[owner[rows]] = valid[rows]
+        columns.append(stamp_column(line_nanos, line_digits, line_valid))
+    return columns
+
+
+def _stamp_text(data, marks, fraction):
+    """Stamps at `marks` as "YYYYMMDD HH:MM:SS.f" strings."""
+    return [
+        data[pos + 1:pos + 9].decode() + " " + data[pos + 10:pos + 19 + digits].decode()
+        for pos, digits in zip(marks.tolist(), fraction.tolist())
+    ]
+
+
+def _parse_tsmc_rows(lines):
+    return parse_tsmc(lines), np.arange(len(lines))
+
+
+def _merge_dirty(df, rows, data, starts, ends, dirty, parse_rows):
+    """
+    Parse the dirty lines through the text path and interleave their events
+    with `df`, whose events came from line numbers `rows`. `parse_rows`
+    returns the events and the index of the text line behind each one.
+    """
+    owners, text = [], []
+    last = len(starts) - 1
+    for i in np.flatnonzero(dirty):
+        line = data[starts[i]:ends[i]].decode(errors="ignore")
+        # A Unicode break at the end of a terminated line leaves an empty
+        # line after it when the whole file is split
+        if i < last or scan.ends_with_break(data):
+            line += "\n"
+        for part in line.splitlines():
+            owners.append(i)
+            text.append(part)
+
+    extra, extra_rows = parse_rows(text)
+    keys = np.concatenate([np.asarray(rows, dtype=np.int64), np.asarray(owners, dtype=np.int64)[extra_rows]])
+    merged = concat_events([df, extra])
+    order = np.argsort(keys, kind="stable")
+    return merged.iloc[order].reset_index(drop=True)
@@ -0,0 +1,246 @@
+# utils/cache.py
+
+import hashlib
+import json
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+from functools import lru_cache
+from importlib.util import find_spec
+from pathlib import Path
+
+import pandas as pd
+
+# Bytes read at a time when hashing a file that is not already in memory
+HASH_BLOCK_SIZE = 8 * 1024 * 1024
+HAS_PYARROW = find_spec("pyarrow") is not None
+DISK_CACHE_SUFFIX = ".feather"
+# Schema metadata naming the datetime64[ns] columns stored as raw int64
+DISK_CACHE_DATES_KEY = b"log_analyzer.dates"
+
+
+class LRUCache:
+    """
+    In-process LRU cache bounded by the total weight of its values rather
+    than their number. `weigh` gives a value's weight (bytes, characters,
+    rows); once the total passes `max_weight` the least recently used
+    entries are dropped. A value heavier than the whole budget is not
+    kept. Thread-safe; `stats()` reports hits, misses and the weight held.
+    """
+
+    def __init__(self, max_weight, weigh=len):
+        self.max_weight = max_weight
+        self.weigh = weigh
+        self.weight = 0
+        self.hits = 0
+        self.misses = 0
+        self._table = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._table)
+
+    def get(self, key, default=None):
+        with self._lock:
+            entry = self._table.get(key)
+            if entry is None:
+                self.misses += 1
+                return default
+            self.hits += 1
+            self._table.move_to_end(key)
+            return entry[0]
+
+    def put(self, key, value):
+        weight = self.weigh(value)
+        with self._lock:
+            old = self._table.pop(key, None)
+            if old is not None:
+                self.weight -= old[1]
+            if weight > self.max_weight:
+                return
+            self._table[key] = (value, weight)
+            self.weight += weight
+            while self.weight > self.max_weight:
+                _, (_, dropped) = self._table.popitem(last=False)
+                self.weight -= dropped
+
+    @property
+    def hit_rate(self):
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def stats(self):
+        return {"hits": self.hits, "misses": self.misses, "size": len(self._table), "weight": self.weight, "hit_rate": self.hit_rate}
+
+    def clear(self):
+        with self._lock:
+            self._table.clear()
+            self.weight = 0
+            self.hits = self.misses = 0
+
+
+class DiskCache:
+    """
+    Parsed frames stored as uncompressed Feather (Arrow IPC) files in
+    `directory`, one file per key, so they outlive the process. Each file
+    holds a single record batch and is read memory-mapped with
+    split_blocks, so numbers, category codes and Arrow-backed strings
+    point into the map instead of being copied. Datetime columns are
+    stored as their int64 nanoseconds (Arrow would turn NaT into nulls,
+    which pandas can only read back by copying) and viewed as dates
+    again on reading. Each file name carries `version`: entries written
+    by other versions are never read and are deleted first when space is
+    needed. Past `max_bytes` the least recently read entries are deleted.
+    A frame Arrow cannot store is simply not cached. Without pyarrow the
+    cache stays empty, and so it does when `directory` belongs to another
+    user, who could read the cached logs or plant entries; a directory it
+    creates is private to the current user.
+    """
+
+    def __init__(self, directory, max_bytes, version):
+        self.directory = Path(directory)
+        self.max_bytes = max_bytes
+        self.version = version
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._private = None
+
+    @property
+    def enabled(self):
+        return HAS_PYARROW and self.max_bytes > 0 and self.private()
+
+    def private(self):
+        """Create `directory` (mode 0700) if needed; whether it is a directory owned by this user."""
+        if self._private is None:
+            try:
+                self.directory.mkdir(mode=0o700, parents=True, exist_ok=True)
+                info = self.directory.stat()
+            except OSError:
+                return False
+            owner = os.getuid() if hasattr(os, "getuid") else info.st_uid
+            self._private = self.directory.is_dir() and info.st_uid == owner
+        return self._private
+
+    def path(self, key):
+        return self.directory / f"{key}.{self.version}{DISK_CACHE_SUFFIX}"
+
+    def get(self, key):
+        path = self.path(key)
+        if not self.enabled or not path.is_file():
+            self.misses += 1
+            return None
+        from pyarrow import feather
+        try:
+            table = feather.read_table(path, memory_map=True)
+            df = table.to_pandas(split_blocks=True)
+            os.utime(path)
+        except (OSError, ValueError):
+            # Evicted by another process, or a partial file
+            self.misses += 1
+            return None
+        self.hits += 1
+        dates = json.loads((table.schema.metadata or {}).get(DISK_CACHE_DATES_KEY, b"[]"))
+        for col in dates:
+            df[col] = pd.Series(df[col].to_numpy().view("datetime64[ns]"), index=df.index, copy=False)
+        return df
+
+    def put(self, key, df):
+        if not self.enabled:
+            return
+        import pyarrow as pa
+        from pyarrow import feather
+        self.directory.mkdir(mode=0o700, parents=True, exist_ok=True)
+        handle, temp = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        os.close(handle)
+        try:
+            dates = [col for col in df.columns if df[col].dtype == "datetime64[ns]"]
+            df = df.reset_index(drop=True).assign(**{col: df[col].to_numpy().view("int64") for col in dates})
+            table = pa.Table.from_pandas(df, preserve_index=False)
+            table = table.replace_schema_metadata({**(table.schema.metadata or {}), DISK_CACHE_DATES_KEY: json.dumps(dates).encode()})
+            feather.write_feather(table, temp, compression="uncompressed", chunksize=max(len(df), 1))
+            os.replace(temp, self.path(key))
+        except (OSError, TypeError, ValueError, pa.ArrowException):
+            os.unlink(temp)
+            return
+        self.evict()
+
+    def evict(self):
+        """Delete entries of other versions, then the least recently read ones past `max_bytes`."""
+        with self._lock:
+            entries = []
+            for path in self.directory.glob(f"*{DISK_CACHE_SUFFIX}"):
+                try:
+                    stat = path.stat()
+                except OSError:
+                    continue
+                current = path.name.endswith(f".{self.version}{DISK_CACHE_SUFFIX}")
+                entries.append((current, stat.st_mtime, stat.st_size, path))
+            entries.sort()
+            total = sum(size for _, _, size, _ in entries)
+            for current, _, size, path in entries:
+                if current and total <= self.max_bytes:
+                    break
+                path.unlink(missing_ok=True)
+                total -= size
+
+    @property
+    def hit_rate(self):
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def stats(self):
+        return {"hits": self.hits, "misses": self.misses, "hit_rate": self.hit_rate}
+
+    def clear(self):
+        if not self.private():
+            return
+        with self._lock:
+            for path in self.directory.glob(f"*{DISK_CACHE_SUFFIX}"):
+                path.unlink(missing_ok=True)
+            self.hits = self.misses = 0
+
+
+def content_hash(data):
+    """Hex digest identifying a file's content."""
+    return hashlib.blake2b(data, digest_size=16).hexdigest()
+
+
+def file_hash(file):
+    """
+    `content_hash` of an open file from its start, without moving its
+    position. In-memory uploads are hashed in place; other files are read
+    in HASH_BLOCK_SIZE blocks.
+    """
+    if hasattr(file, "getbuffer"):
+        with file.getbuffer() as data:
+            return content_hash(data)
+    pos = file.tell()
+    file.seek(0)
+    digest = hashlib.blake2b(digest_size=16)
+    try:
+        while block := file.read(HASH_BLOCK_SIZE):
+            digest.update(block)
+    finally:
+        file.seek(pos)
+    return digest.hexdigest()
+
+
+@lru_cache(maxsize=None)
+def parser_version():
+    """
+    Digest of the parsing code (every module of this package), part of the
+    key of cached parse results so they are dropped whenever a parser
+    changes.
+    """
+    digest = hashlib.blake2b(digest_size=8)
+    for path in sorted(Path(__file__).parent.glob("*.py")):
+        digest.update(path.name.encode())
+        digest.update(path.read_bytes())
+    return digest.hexdigest()
+
+
+def frame_weight(df):
+    """Memory held by a DataFrame in bytes, strings included."""
+    return int(df.memory_usage(index=True, deep=True).sum())
@@ -0,0 +1,115 @@
+# utils/compression.py
+
+import bz2
+import gzip
+import io
+import lzma
+import re
+import threading
+from itertools import chain
+from queue import Empty, Full, Queue
+
+from utils import registry
+from utils.parser import STREAM_BLOCK_SIZE, PieceReader, concat_events, iter_newline_pieces, parse_buffer
+
+# (magic bytes, stream opener) for every compressed container we read;
+# the openers leave the underlying file open when they are closed
+COMPRESSIONS = [
+    (b"\x1f\x8b", lambda file: gzip.GzipFile(fileobj=file, mode="rb")),
+    (b"BZh", bz2.BZ2File),
+    (b"\xfd7zXZ\x00", lzma.LZMAFile),
+]
+MAGIC_BYTES = max(len(magic) for magic, _ in COMPRESSIONS)
+COMPRESSED_SUFFIX_RE = re.compile(r"\.(gz|gzip|bz2|xz)$", re.IGNORECASE)
+
+# Decompressed blocks buffered between the decompressing thread and the
+# parser; bounds memory at about PIPELINE_DEPTH * STREAM_BLOCK_SIZE
+PIPELINE_DEPTH = 4
+_DONE = object()
+
+
+def detect(head):
+    """Stream opener for the compression format `head` starts with, or None."""
+    for magic, opener in COMPRESSIONS:
+        if head.startswith(magic):
+            return opener
+    return None
+
+
+def load_compressed(file, opener, parallel=True):
+    """
+    Parse a gzip/bzip2/xz compressed log without writing it out or holding
+    it decompressed in memory. A background thread decompresses
+    newline-aligned blocks into a bounded queue while they are parsed,
+    either here or, when the file spans several blocks and `parallel` is
+    set, across the process pool. The format is sniffed from the first
+    decompressed block, with the compression suffix dropped from the name;
+    whole-file formats (CSV) read the decompressed stream directly.
+    """
+    name = COMPRESSED_SUFFIX_RE.sub("", getattr(file, "name", "") or "")
+    pieces = iter_decompressed(file, opener)
+    try:
+        first = next(pieces, b"")
+        spec = registry.sniff(first[:registry.SNIFF_BYTES], name)
+        if spec.file_target:
+            return spec.load_file()(io.BufferedReader(PieceReader(chain([first], pieces))))
+        second = next(pieces, None)
+        if second is None:
+            return parse_buffer(spec, first)
+        pieces_left = chain([first, second], pieces)
+        if parallel:
+            from utils.parallel import parse_stream
+            return parse_stream(spec, pieces_left)
+        return concat_events([parse_buffer(spec, piece) for piece in pieces_left])
+    finally:
+        pieces.close()
+
+
+def iter_decompressed(file, opener, block_size=STREAM_BLOCK_SIZE):
+    """
+    Decompressed content of `file` in pieces of about `block_size` bytes
+    that end right after a line break. The producer runs in its own thread
+    (zlib, bz2 and lzma release the GIL) and stays at most PIPELINE_DEPTH
+    pieces ahead; closing the generator stops it. Decompression errors are
+    raised here, in the consumer.
+    """
+    pieces = Queue(maxsize=PIPELINE_DEPTH)
+    stop = threading.Event()
+
+    def put(item):
+        while not stop.is_set():
+            try:
+                pieces.put(item, timeout=0.1)
+                return True
+            except Full:
+                pass
+        return False
+
+    def produce():
+        try:
+            with opener(file) as stream:
+                for piece in iter_newline_pieces(stream, block_size):
+                    if not put(piece):
+                        return
+        except Exception as e:
+            put(e)
+        put(_DONE)
+
+    producer = threading.Thread(target=produce, name="log-decompress", daemon=True)
+    producer.start()
+    try:
+        while True:
+            try:
+                item = pieces.get(timeout=0.1)
+            except Empty:
+                if not producer.is_alive() and pieces.empty():
+                    return
+                continue
+            if item is _DONE:
+                return
+            if isinstance(item, Exception):
+                raise item
+            yield item
+    finally:
+        stop.set()
+        producer.join()
@@ -0,0 +1,80 @@
+# utils/csv_parser.py
+
+import io
+import os
+from importlib.util import find_spec
+
+import pandas as pd
+
+from utils import registry
+from utils.parser import concat_events, file_size, parse_generic
+from utils.schema import frame_to_events, is_event_mapping, map_headers
+
+# Rows per chunk when the C engine streams a file
+CSV_CHUNK_ROWS = 250_000
+# Files up to this size are read in one go by pyarrow when it is installed;
+# larger ones are streamed in chunks by the C engine
+CSV_ARROW_LIMIT = 256 * 1024 * 1024
+HAS_PYARROW = find_spec("pyarrow") is not None
+# pyarrow's edge is parsing on several threads; on one core the C engine wins
+USE_PYARROW = HAS_PYARROW and (os.cpu_count() or 1) > 1
+
+
+def parse_csv(file, aliases=None):
+    """
+    Parse a CSV export with pd.read_csv. Only the columns whose headers
+    map onto the event schema (see utils.schema) are read, all as plain
+    object (str) columns, rows with none of them set are dropped, and date
+    columns are converted once per chunk. Small files use the
+    pyarrow engine when it is installed and there are several cores to
+    parse on (USE_PYARROW), otherwise the C engine streams
+    CSV_CHUNK_ROWS rows at a time. A CSV without recognizable headers is
+    parsed line by line like any other log.
+    """
+    header = registry.file_head(file).split(b"\n", 1)[0]
+    sep = registry.guess_delimiter(header.decode(errors="ignore"))
+    columns = pd.read_csv(io.BytesIO(header), sep=sep, nrows=0, encoding_errors="ignore").columns
+    mapping = map_headers(columns, aliases)
+    if not is_event_mapping(mapping):
+        return parse_generic(file.read().decode(errors="ignore").splitlines())
+
+    options = dict(
+        sep=sep,
+        usecols=list(mapping),
+        dtype={header: object for header in mapping},
+        skipinitialspace=True,
+        keep_default_na=False,
+        na_values=[""],
+        encoding_errors="ignore",
+    )
+    if USE_PYARROW and file.seekable() and file_size(file) <= CSV_ARROW_LIMIT:
+        # pyarrow has no skipinitialspace: read the cells as they are and
+        # strip the leading blanks afterwards
+        # pyarrow also keeps the header names as probed above
+        arrow_options = {key: value for key, value in options.items() if key != "skipinitialspace"}
+        arrow_options["dtype"] = {header: str for header in mapping}
+        pos = file.tell()
+        try:
+            frame = pd.read_csv(file, engine="pyarrow", **arrow_options)
+        except (pd.errors.ParserError, UnicodeDecodeError):
+            # Ragged rows and invalid UTF-8, which the C engine skips or drops
+            file.seek(pos)
+        else:
+            return frame_to_events(_strip_leading(frame).dropna(how="all"), mapping)
+    # skipinitialspace would strip the header names too; keep the probed ones
+    chunks = pd.read_csv(file, engine="c", chunksize=CSV_CHUNK_ROWS, on_bad_lines="skip", names=list(columns), header=0, **options)
+    return concat_events([frame_to_events(chunk.dropna(how="all"), mapping) for chunk in chunks])
+
+
+def _strip_leading(frame):
+    """
+    What skipinitialspace does: leading blanks dropped, blank cells
+    missing. Unlike the C engine's option this also strips blanks inside
+    quotes, which no longer show once parsed.
+    """
+    columns = {}
+    for col in frame.columns:
+        values = frame[col].str.lstrip(" ")
+        # Plain object columns, like the C engine gives the schema helpers
+        columns[col] = values.where(values != "").to_numpy(dtype=object, na_value=None)
+    return frame.assign(**columns)
@@ -0,0 +1,49 @@
+# utils/docx_parser.py
+
+from docx import Document
+from docx.table import Table
+
+from utils.parser import concat_events, parse_lines
+from utils.schema import table_to_events
+
+
+def parse_docx(file):
+    """
+    Parse a Word document. Paragraphs and tables are visited lazily in
+    document order: paragraph text (and tables whose header does not map
+    onto the event schema, row by row) streams into the line parser of the
+    format it looks like, so no full text copy of the document is built;
+    tables whose header maps become events column-wise.
+    """
+    document = Document(file)
+    frames = []
+
+    def lines():
+        for block in document.iter_inner_content():
+            if not isinstance(block, Table):
+                yield from block.text.splitlines()
+                continue
+            rows = [list(_grid_cells(row)) for row in block.rows]
+            events = table_to_events(rows)
+            if events is None:
+                yield from (" ".join(cell for cell in row if cell) for row in rows)
+            else:
+                frames.append(events)
+
+    text = parse_lines(lines(), getattr(file, "name", "") or "")
+    return concat_events([text] + frames)
+
+
+def _grid_cells(row):
+    """
+    Text of each grid column of a table row. A merged cell is returned by
+    python-docx once per column it spans; its text is kept in the first
+    one and the others are None, so later cells stay under their headers.
+    """
+    seen = set()
+    for cell in row.cells:
+        if id(cell._tc) in seen:
+            yield None
+        else:
+            seen.add(id(cell._tc))
+            yield cell.text.strip()
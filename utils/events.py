@@ -0,0 +1,86 @@
+# utils/events.py
+
+import pandas as pd
+
+EVENT_COLUMNS = ["Raise Date", "Severity", "Device Name", "Alarm Name", "Status", "Message", "Terminated Date"]
+
+
+class EventColumns:
+    """
+    Columnar accumulator shared by the parsers.
+
+    Vectorized parsers add whole columns for a block of rows with `add`;
+    record-at-a-time sources use `append`, which goes into one list per
+    column. Columns holding the same value on every row are set once with
+    `constant` and only broadcast when the DataFrame is built.
+    """
+
+    def __init__(self, columns=EVENT_COLUMNS):
+        self.columns = list(columns)
+        self.constants = {}
+        self._blocks = {col: [] for col in self.columns}
+        self._rows = {col: [] for col in self.columns}
+        self._length = 0
+        self._pending = 0
+
+    def __len__(self):
+        return self._length + self._pending
+
+    def constant(self, column, value):
+        """Use `value` for every row of `column`."""
+        self.constants[column] = value
+
+    def add(self, length, columns):
+        """
+        Add `length` rows given as {column: array}. Columns left out are
+        missing for these rows.
+        """
+        self._flush()
+        for col in self.columns:
+            values = columns.get(col)
+            if isinstance(values, pd.Series):
+                values = values.to_numpy()
+            self._blocks[col].append((length, values))
+        self._length += length
+
+    def append(self, record):
+        """Add one event given as {column: value}."""
+        for col, values in self._rows.items():
+            values.append(record.get(col))
+        self._pending += 1
+
+    def to_frame(self):
+        """Build the DataFrame straight from the accumulated columns."""
+        self._flush()
+        if not self._length:
+            return pd.DataFrame()
+        data = {
+            col: self.constants[col] if col in self.constants else _build_column(self._blocks[col])
+            for col in self.columns
+        }
+        return pd.DataFrame(data, index=pd.RangeIndex(self._length), columns=self.columns)
+
+    def _flush(self):
+        if not self._pending:
+            return
+        for col, values in self._rows.items():
+            self._blocks[col].append((self._pending, values))
+        self._rows = {col: [] for col in self.columns}
+        self._length += self._pending
+        self._pending = 0
+
+
+def _build_column(blocks):
+    """
+    Join the blocks of one column. A column with no values at all becomes a
+    plain None column, like the row-by-row parsers produced.
+    """
+    if not any(values is not None and pd.notna(values).any() for _, values in blocks):
+        return None
+    if len(blocks) == 1:
+        return blocks[0][1]
+    parts = [
+        pd.Series([None] * length, dtype=object) if values is None else pd.Series(values).astype(object)
+        for length, values in blocks
+    ]
+    return pd.concat(parts, ignore_index=True).to_numpy()
@@ -0,0 +1,67 @@
+# utils/excel_parser.py
+
+import io
+from itertools import chain, islice
+
+import pandas as pd
+from openpyxl import load_workbook
+
+from utils.parser import concat_events, parse_lines
+from utils.schema import frame_to_events, is_event_mapping, map_headers
+
+# Rows collected per block before they are turned into event columns
+EXCEL_BLOCK_ROWS = 50_000
+
+
+def parse_xlsx(file):
+    """
+    Parse an Excel workbook. Every sheet is streamed with openpyxl in
+    read-only mode, so the full sheet model is never built, and sheets are
+    parsed concurrently, one pool task per sheet.
+    """
+    data = file.read()
+    from utils.parallel import map_target
+    frames = map_target("utils.excel_parser:parse_sheet", [(data, name) for name in sheet_names(data)])
+    return concat_events(frames)
+
+
+def sheet_names(data):
+    book = load_workbook(io.BytesIO(data), read_only=True)
+    try:
+        return book.sheetnames
+    finally:
+        book.close()
+
+
+def parse_sheet(data, name, aliases=None):
+    """
+    Parse one sheet. The first non-empty row is the header and is mapped
+    onto the event schema (see utils.schema); the mapped cells are
+    gathered column by column, EXCEL_BLOCK_ROWS rows at a time. A sheet
+    without recognizable headers is read as text lines and parsed with the
+    format those lines look like.
+    """
+    book = load_workbook(io.BytesIO(data), read_only=True, data_only=True)
+    try:
+        rows = book[name].iter_rows(values_only=True)
+        header = next((row for row in rows if any(cell is not None for cell in row)), None)
+        if header is None:
+            return pd.DataFrame()
+        mapping = map_headers([cell for cell in header if cell is not None], aliases)
+        if not is_event_mapping(mapping):
+            return parse_lines([" ".join(str(cell) for cell in row if cell is not None) for row in chain([header], rows)], name)
+
+        positions = {}
+        for i, cell in enumerate(header):
+            if cell in mapping and cell not in positions:
+                positions[cell] = i
+        frames = []
+        while True:
+            block = list(islice(rows, EXCEL_BLOCK_ROWS))
+            if not block:
+                break
+            columns = {cell: [row[i] if i < len(row) else None for row in block] for cell, i in positions.items()}
+            frames.append(frame_to_events(pd.DataFrame(columns).dropna(how="all"), mapping))
+        return concat_events(frames)
+    finally:
+        book.close()
@@ -0,0 +1,50 @@
+# utils/filters.py
+
+import re
+
+import numpy as np
+import pandas as pd
+
+
+def evaluate(values, predicate):
+    """
+    Boolean row mask from `predicate`, a function taking a Series of text
+    and returning one bool (or NA) per entry. On a categorical column it
+    is evaluated once per category and the result reaches the rows through
+    the category codes, so the cost is O(categories + rows) however costly
+    the predicate. Other columns (free text, where nearly every value is
+    distinct) are evaluated row by row. Missing values never match.
+    """
+    values = pd.Series(values)
+    if not isinstance(values.dtype, pd.CategoricalDtype):
+        return pd.Series(predicate(values)).fillna(False).to_numpy(dtype=bool)
+    matched = pd.Series(predicate(pd.Series(values.cat.categories, dtype=object).map(str))).fillna(False).to_numpy(dtype=bool)
+    # Code -1 (missing) picks the trailing False
+    return np.append(matched, False)[values.cat.codes.to_numpy()]
+
+
+def contains(values, pattern, case=True, regex=True):
+    """Like Series.str.contains(pattern, case, regex, na=False)."""
+    return evaluate(values, lambda text: text.str.contains(pattern, case=case, regex=regex))
+
+
+def matches(values, pattern, case=True):
+    """Values in which the regular expression `pattern` finds a match."""
+    flags = 0 if case else re.IGNORECASE
+    return evaluate(values, lambda text: text.str.contains(pattern, flags=flags, regex=True))
+
+
+def startswith(values, prefix, case=True):
+    """Values starting with `prefix`."""
+    if case:
+        return evaluate(values, lambda text: text.str.startswith(prefix))
+    return evaluate(values, lambda text: text.str.lower().str.startswith(prefix.lower()))
+
+
+def isin(values, items, case=True):
+    """Values equal to one of `items`, like Series.isin (or of str.lower().isin when not `case`)."""
+    items = [str(item) for item in items]
+    if case:
+        return evaluate(values, lambda text: text.isin(items))
+    items = [item.lower() for item in items]
+    return evaluate(values, lambda text: text.str.lower().isin(items))
@@ -0,0 +1,153 @@
+# utils/json_parser.py
+
+import codecs
+import json
+import re
+from itertools import chain, islice
+
+import pandas as pd
+
+from utils import registry
+from utils.parser import concat_events
+from utils.schema import frame_to_events, is_event_mapping, map_headers
+
+# Records decoded and turned into columns at a time
+JSON_BATCH = 50_000
+# Bytes read at a time while streaming a JSON array
+JSON_READ_BLOCK = 1024 * 1024
+
+_SEPARATORS_RE = re.compile(r"[\s,]*")
+_VALUE_ENDS = frozenset(",] \t\r\n")
+
+
+def parse_ndjson(lines, aliases=None):
+    """
+    Parse newline-delimited JSON. Each batch of JSON_BATCH lines is decoded
+    with one json.loads call (line by line only if the batch holds a bad
+    line) and its records go straight into columns. A lone object whose
+    keys do not map onto the event schema is read as a compact document
+    and its list of records is used instead.
+    """
+    frames = []
+    for start in range(0, len(lines), JSON_BATCH):
+        records = decode_lines(lines[start:start + JSON_BATCH])
+        if len(records) == 1 and _is_wrapper(records[0], aliases):
+            # One compact document ({"events": [...]}) rather than a record
+            records = find_records(records[0])
+        frames.append(records_to_events(records, aliases))
+    return concat_events(frames)
+
+
+def parse_json(file, aliases=None):
+    """
+    Parse a JSON document. A top-level array is decoded incrementally,
+    one record at a time from a sliding text buffer, so a huge array never
+    becomes one Python object tree; records are turned into columns
+    JSON_BATCH at a time. A top-level object is loaded whole and its first
+    list of records is used (or the object itself as a single record).
+    """
+    head = registry.file_head(file, 1024).lstrip()
+    if not head.startswith(b"["):
+        document = json.loads(file.read().decode(errors="ignore") or "null")
+        return records_to_events(find_records(document), aliases)
+    records = iter_array(file)
+    frames = []
+    while True:
+        batch = list(islice(records, JSON_BATCH))
+        if not batch:
+            break
+        frames.append(records_to_events([record for record in batch if isinstance(record, dict)], aliases))
+    return concat_events(frames)
+
+
+def decode_lines(lines):
+    """Records (dicts) in a batch of NDJSON lines; undecodable lines are skipped."""
+    lines = [line for line in lines if line.strip()]
+    try:
+        records = json.loads("[" + ",".join(lines) + "]")
+    except ValueError:
+        records = [_loads(line) for line in lines]
+    return [record for record in records if isinstance(record, dict)]
+
+
+def _loads(line):
+    try:
+        return json.loads(line)
+    except ValueError:
+        return None
+
+
+def iter_array(file, block_size=JSON_READ_BLOCK):
+    """Yield the elements of the top-level JSON array in `file` one by one."""
+    decoder = json.JSONDecoder()
+    text = codecs.getincrementaldecoder("utf-8")(errors="ignore")
+    buffer = ""
+    pos = 0
+    eof = False
+
+    def refill():
+        nonlocal buffer, pos, eof
+        block = file.read(block_size)
+        eof = not block
+        buffer = buffer[pos:] + text.decode(block, final=eof)
+        pos = 0
+
+    while "[" not in buffer and not eof:
+        refill()
+    pos = buffer.find("[") + 1 if "[" in buffer else len(buffer)
+    while True:
+        pos = _SEPARATORS_RE.match(buffer, pos).end()
+        if pos >= len(buffer):
+            if eof:
+                return
+            refill()
+            continue
+        if buffer[pos] == "]":
+            return
+        try:
+            value, end = decoder.raw_decode(buffer, pos)
+        except json.JSONDecodeError:
+            if eof:
+                raise
+            refill()
+            continue
+        if not eof and (end == len(buffer) or buffer[end] not in _VALUE_ENDS):
+            # A number cut by the end of the buffer may continue in the next block
+            refill()
+            continue
+        yield value
+        pos = end
+
+
+def find_records(document):
+    """The records held by a decoded JSON document."""
+    if isinstance(document, list):
+        return [record for record in document if isinstance(record, dict)]
+    if not isinstance(document, dict):
+        return []
+    for value in document.values():
+        if isinstance(value, list) and value and all(isinstance(record, dict) for record in value):
+            return value
+    return [document]
+
+
+def _is_wrapper(record, aliases=None):
+    """Whether a lone object is a document holding records rather than an event itself."""
+    return isinstance(record, dict) and not is_event_mapping(map_headers(record, aliases))
+
+
+def records_to_events(records, aliases=None):
+    """
+    Events from a list of JSON records, one column per mapped key (see
+    utils.schema). Records whose keys map onto neither a date nor a
+    message keep their JSON text as the message.
+    """
+    if not records:
+        return pd.DataFrame()
+    keys = dict.fromkeys(chain.from_iterable(records))
+    mapping = map_headers(keys, aliases)
+    if not is_event_mapping(mapping):
+        frame = pd.DataFrame({"message": [json.dumps(record) for record in records]})
+        return frame_to_events(frame, {"message": "Message"})
+    columns = {key: [record.get(key) for record in records] for key in mapping}
+    return frame_to_events(pd.DataFrame(columns, index=pd.RangeIndex(len(records))), mapping)
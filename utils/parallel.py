@@ -0,0 +1,402 @@
+# utils/parallel.py
+
+import atexit
+import io
+import multiprocessing
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from pathlib import Path
+
+import pandas as pd
+
+from utils import archive, parser, registry
+from utils.cache import DiskCache, LRUCache, content_hash, file_hash, frame_weight, parser_version
+from utils.parser import (
+    clean_events, concat_events, file_size, iter_newline_pieces, load_file, load_path,
+    map_file, newline_spans, parse_buffer, pick_format,
+)
+from utils.schema import type_events, unify_categories
+from utils.search import SearchIndex
+
+POOL_WORKERS = os.cpu_count() or 1
+SPLIT_PIECES_PER_WORKER = 4
+SPLIT_MIN_PIECE = 4 * 1024 * 1024
+# Memory held by parsed files, and by combined event frames, kept across reruns
+PARSE_CACHE_BYTES = 1024 * 1024 * 1024
+EVENTS_CACHE_BYTES = 1024 * 1024 * 1024
+# Parsed files kept on disk across server restarts, in the user's cache
+# directory (LOG_ANALYZER_CACHE_DIR overrides the location; a cap of 0
+# turns the disk cache off)
+DISK_CACHE_DIR = os.environ.get("LOG_ANALYZER_CACHE_DIR") or os.path.join(
+    os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache"), "log-analyzer"
+)
+DISK_CACHE_BYTES = 8 * 1024 * 1024 * 1024
+
+_POOL = None
+
+# (content hash, file name, parser version) -> parsed frame. Streamlit
+# reruns the script on every widget change; this keeps reruns from
+# parsing the same files again.
+PARSE_CACHE = LRUCache(PARSE_CACHE_BYTES, weigh=frame_weight)
+# Parse cache keys of a set of files -> their combined, cleaned events and
+# the search index over them
+EVENTS_CACHE = LRUCache(EVENTS_CACHE_BYTES, weigh=lambda entry: frame_weight(entry[0]) + entry[1].nbytes)
+# Second level behind PARSE_CACHE, shared by every server process
+DISK_CACHE = DiskCache(DISK_CACHE_DIR, DISK_CACHE_BYTES, parser_version())
+
+
+def get_pool():
+    """
+    Process pool shared by every rerun of the Streamlit script.
+    Module state survives reruns, so workers are started once per server.
+    Workers come from a fork server (spawned where there is none) rather
+    than by forking the multi-threaded server, which could leave a child
+    holding a lock another thread had taken.
+    """
+    global _POOL
+    if _POOL is None:
+        method = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+        context = multiprocessing.get_context(method)
+        if method == "forkserver":
+            # Workers fork from a server that already imported the parsers
+            context.set_forkserver_preload(["utils.parallel"])
+        _POOL = ProcessPoolExecutor(max_workers=POOL_WORKERS, mp_context=context)
+        atexit.register(_POOL.shutdown, wait=False, cancel_futures=True)
+    return _POOL
+
+
+def pool_enabled():
+    """
+    Whether work should be spread over the pool: it has more than one
+    worker (with one, pickling only adds cost) and this process is not one
+    of them.
+    """
+    return POOL_WORKERS > 1 and not in_worker()
+
+
+def parse_files(files):
+    """
+    Parse uploaded files, reusing frames from PARSE_CACHE for content
+    already parsed by the current parsers. Returns a list of (name, cache
+    key, DataFrame or exception) in upload order.
+    """
+    keys = [_guard(lambda file=file: (file_hash(file), file.name, parser_version())) for file in files]
+    return _cached(keys, [file.name for file in files], files, _parse_files)
+
+
+def parse_paths(paths):
+    """
+    Parse files on the server's disk, reusing frames from PARSE_CACHE as
+    in `parse_files`. Returns a list of (name, cache key, DataFrame or
+    exception) in the given order.
+    """
+    paths = [Path(path) for path in paths]
+    keys = [_guard(lambda path=path: (_path_hash(path), path.name, parser_version())) for path in paths]
+    return _cached(keys, [path.name for path in paths], paths, _parse_paths)
+
+
+def combine_events(parsed):
+    """
+    One cleaned events frame from the (name, cache key, DataFrame) results
+    of `parse_files`/`parse_paths`, each event named after its file unless
+    it already is (archive members), together with its full-text
+    SearchIndex. Both are cached in EVENTS_CACHE by the results' keys, so
+    reruns skip the concatenation, sort and indexing. The frame is shared
+    between reruns and must not be modified in place.
+    """
+    key = tuple((name, file_key) for name, file_key, _ in parsed)
+    cacheable = all(file_key is not None for _, file_key, _ in parsed)
+    entry = EVENTS_CACHE.get(key) if cacheable else None
+    if entry is None:
+        frames = [frame if "source_file" in frame.columns else frame.assign(source_file=Path(name).name) for name, _, frame in parsed]
+        frames = unify_categories(type_events(frame) for frame in frames)
+        df = clean_events(pd.concat(frames, ignore_index=True))
+        entry = df, SearchIndex(df)
+        if cacheable:
+            EVENTS_CACHE.put(key, entry)
+    return entry
+
+
+def _cached(keys, names, items, parse):
+    """
+    Results for `items` (with their cache `keys`, or exceptions raised
+    while hashing) from PARSE_CACHE or else DISK_CACHE, calling `parse`
+    once on the items missing from both and caching what it parses.
+    """
+    results = [None] * len(items)
+    missing = []
+    for i, key in enumerate(keys):
+        if isinstance(key, Exception):
+            keys[i] = key = None
+        frame = None
+        if key is not None:
+            frame = PARSE_CACHE.get(key)
+            if frame is None:
+                frame = DISK_CACHE.get(_disk_key(key))
+                if frame is not None:
+                    PARSE_CACHE.put(key, frame)
+        if frame is None:
+            missing.append(i)
+        else:
+            results[i] = (names[i], key, frame)
+    if missing:
+        for i, (name, result) in zip(missing, parse([items[i] for i in missing])):
+            if not isinstance(result, Exception):
+                result = type_events(result)
+                if keys[i] is not None:
+                    PARSE_CACHE.put(keys[i], result)
+                    DISK_CACHE.put(_disk_key(keys[i]), result)
+            results[i] = (name, keys[i], result)
+    return results
+
+
+def _disk_key(key):
+    # DISK_CACHE files are named by content and file name; it adds the version itself
+    digest, name, _ = key
+    return content_hash(f"{digest}/{name}".encode())
+
+
+def _path_hash(path):
+    with map_file(path) as data:
+        return content_hash(data)
+
+
+def _parse_files(files):
+    """
+    Parse uploaded files in parallel, one pool task per file.
+    Files above SPLIT_THRESHOLD, archives and formats whose parser spreads
+    its own work (workbooks) are instead spread across the pool by
+    `load_file` itself. Returns a list of (name, DataFrame or exception)
+    in upload order.
+    """
+    if not pool_enabled():
+        return [(file.name, _guard(load_file, file, False)) for file in files]
+    large = [file_size(file) > parser.SPLIT_THRESHOLD or archive.detect(file) is not None or pick_format(file).spreads for file in files]
+    payloads = [(file.name, file.read()) for file, big in zip(files, large) if not big]
+    futures = []
+    if len(payloads) > 1:
+        try:
+            pool = get_pool()
+            futures = [pool.submit(parse_bytes, name, data) for name, data in payloads]
+        except BrokenProcessPool:
+            _reset_pool()
+
+    results = []
+    small = iter(zip(payloads, futures or [None] * len(payloads)))
+    for file, big in zip(files, large):
+        if big:
+            results.append((file.name, _guard(load_file, file)))
+            continue
+        (name, data), future = next(small)
+        if future is None:
+            results.append((name, _guard(lambda: from_columns(parse_bytes(name, data)))))
+        else:
+            results.append((name, _guard(lambda: from_columns(future.result()))))
+    return results
+
+
+def _parse_paths(paths):
+    """
+    Parse files on the server's disk in parallel, one pool task per file.
+    Workers map the files themselves, so no file content is pickled; files
+    above SPLIT_THRESHOLD and archives are spread across the pool by
+    `load_path`.
+    Returns a list of (name, DataFrame or exception) in the given order.
+    """
+    paths = [Path(path) for path in paths]
+    if not pool_enabled():
+        return [(path.name, _guard(load_path, path, False)) for path in paths]
+    large = [_guard(_spreads, path) for path in paths]
+    small = [path for path, big in zip(paths, large) if big is False]
+    futures = {}
+    if len(small) > 1:
+        try:
+            pool = get_pool()
+            futures = {path: pool.submit(parse_path, str(path)) for path in small}
+        except BrokenProcessPool:
+            _reset_pool()
+
+    results = []
+    for path, big in zip(paths, large):
+        if isinstance(big, Exception):
+            results.append((path.name, big))
+        elif big:
+            results.append((path.name, _guard(load_path, path)))
+        elif path in futures:
+            results.append((path.name, _guard(lambda: from_columns(futures[path].result()))))
+        else:
+            results.append((path.name, _guard(load_path, path, False)))
+    return results
+
+
+def parse_split(file, spec, size):
+    """
+    Parse one large file across the pool. The file is read in pieces that
+    each end right after a newline, every piece is parsed with the format
+    `spec` in a worker, and the chunks are stitched back together in line
+    order.
+    """
+    workers = POOL_WORKERS
+    piece_size = max(-(-size // (workers * SPLIT_PIECES_PER_WORKER)), SPLIT_MIN_PIECE)
+    return _stitch((parse_piece, spec, piece) for piece in iter_newline_pieces(file, piece_size))
+
+
+def parse_split_path(path, spec, data):
+    """
+    Parse one large mapped file across the pool. Only the newline-aligned
+    (start, end) spans are sent; each worker maps the file itself and
+    reads only its own span.
+    """
+    piece_size = max(-(-len(data) // (POOL_WORKERS * SPLIT_PIECES_PER_WORKER)), SPLIT_MIN_PIECE)
+    return _stitch((parse_span, spec, str(path), start, end) for start, end in newline_spans(data, piece_size))
+
+
+def parse_stream(spec, pieces):
+    """
+    Parse newline-aligned pieces produced on the fly (e.g. by a
+    decompressing thread) across the pool, in order.
+    """
+    return _stitch((parse_piece, spec, piece) for piece in pieces)
+
+
+def parse_pieces(items):
+    """
+    Parse (spec, piece) pairs produced on the fly across the pool, yielding
+    one DataFrame per piece in order.
+    """
+    return _ordered((parse_piece, spec, piece) for spec, piece in items)
+
+
+def map_target(target, calls):
+    """
+    Call the parser named by `target` ("module:function", see
+    utils.registry) once per argument tuple in `calls`, across the pool,
+    returning the frames in order. Inside a pool worker the calls run in
+    place instead, as they do with a single worker.
+    """
+    if not pool_enabled() or len(calls) < 2:
+        func = registry.resolve(target)
+        return [func(*args) for args in calls]
+    return list(_ordered((run_target, target, *args) for args in calls))
+
+
+def map_calls(target, calls):
+    """
+    Like `map_target` for functions returning any picklable value rather
+    than a frame.
+    """
+    if not pool_enabled() or len(calls) < 2:
+        func = registry.resolve(target)
+        return [func(*args) for args in calls]
+    return list(_ordered(((call_target, target, *args) for args in calls), raw=True))
+
+
+def in_worker():
+    """Whether this process is one of the pool's workers."""
+    return multiprocessing.parent_process() is not None
+
+
+def _stitch(tasks):
+    """Run (func, *args) tasks in the pool and concatenate their chunks in task order."""
+    return concat_events(list(_ordered(tasks)))
+
+
+def _ordered(tasks, raw=False):
+    """
+    Run (func, *args) tasks in the pool, yielding their chunks in task
+    order (rebuilt from columns unless `raw`). Only a bounded number of
+    tasks is in flight at a time, and the `tasks` iterable is only
+    advanced as slots free up.
+    """
+    rebuild = (lambda result: result) if raw else from_columns
+    pool = get_pool()
+    pending = deque()
+    for task in tasks:
+        if len(pending) >= POOL_WORKERS * 2:
+            yield rebuild(pending.popleft().result())
+        pending.append(pool.submit(*task))
+    while pending:
+        yield rebuild(pending.popleft().result())
+
+
+def parse_bytes(name, data):
+    """Pool task: parse one file's bytes and return it as columns."""
+    buf = io.BytesIO(data)
+    buf.name = name
+    return to_columns(load_file(buf, parallel=False))
+
+
+def parse_path(path):
+    """Pool task: parse one file on disk and return it as columns."""
+    return to_columns(load_path(path, parallel=False))
+
+
+def parse_span(spec, path, start, end):
+    """Pool task: parse the bytes between `start` and `end` of a file on disk."""
+    with map_file(path) as data:
+        return to_columns(parse_buffer(spec, data[start:end]))
+
+
+def run_target(target, *args):
+    """Pool task: call the parser named by `target` and return its frame as columns."""
+    return to_columns(registry.resolve(target)(*args))
+
+
+def call_target(target, *args):
+    """Pool task: call the function named by `target` and return its result."""
+    return registry.resolve(target)(*args)
+
+
+def parse_piece(spec, data):
+    """Pool task: parse one newline-aligned piece of a larger file."""
+    return to_columns(parse_buffer(spec, data))
+
+
+def to_columns(df):
+    """
+    Compact columnar form of a parsed frame for sending between processes:
+    the row count plus one array per column, with a bare None for columns
+    that hold no values. Columns keep their own arrays, so Arrow-backed
+    strings are pickled as a few buffers rather than one Python str per
+    row, and the receiving side rebuilds them without copying each value.
+    """
+    return len(df), {
+        col: df[col].array if df[col].notna().any() else None
+        for col in df.columns
+    }
+
+
+def from_columns(payload):
+    """Rebuild the DataFrame produced by `to_columns`."""
+    length, columns = payload
+    if not columns:
+        return pd.DataFrame()
+    return pd.DataFrame(columns, index=pd.RangeIndex(length), columns=list(columns))
+
+
+def _spreads(path):
+    """Whether `load_path` spreads the file at `path` across the pool itself."""
+    if path.stat().st_size > parser.SPLIT_THRESHOLD:
+        return True
+    with open(path, "rb") as handle:
+        return archive.detect(handle) is not None or registry.sniff(registry.peek(handle), path.name).spreads
+
+
+def _guard(func, *args):
+    """Call `func`, returning the exception instead of raising it."""
+    try:
+        return func(*args)
+    except BrokenProcessPool as e:
+        _reset_pool()
+        return e
+    except Exception as e:
+        return e
+
+
+def _reset_pool():
+    global _POOL
+    if _POOL is not None:
+        _POOL.shutdown(wait=False, cancel_futures=True)
+    _POOL = None
@@ -1,136 +1,486 @@
+import io
+import mmap
+import numpy as np
+import os
 import pandas as pd
 import re
+from contextlib import contextmanager
 from datetime import datetime
+from glob import glob
+from itertools import islice
+from pathlib import Path
+from utils import filters, registry
+from utils.events import EventColumns
+from utils.schema import DATE_COLUMNS, type_events
+from utils.timestamps import STAMP_CACHE, TSMC_STAMP_FORMAT, infer_stamp_format
 
-def load_file(file):
+STREAM_BLOCK_SIZE = 8 * 1024 * 1024
+STREAM_THRESHOLD = 64 * 1024 * 1024
+# Above this size one file is cut at newlines and parsed across the pool,
+# when it has more than one worker (LOG_ANALYZER_SPLIT_BYTES overrides it)
+SPLIT_THRESHOLD = int(os.environ.get("LOG_ANALYZER_SPLIT_BYTES") or 32 * 1024 * 1024)
+
+# Lines handed to a line parser at a time by `parse_lines`
+LINE_BLOCK = 200_000
+
+# Directories whose logs may be analyzed in place on the server
+# (LOG_ANALYZER_ROOTS, separated by os.pathsep); nothing outside them is read
+SERVER_LOG_ROOTS = os.environ.get("LOG_ANALYZER_ROOTS", "sample_logs").split(os.pathsep)
+
+LINE_BREAK_RE = re.compile(rb"\r\n|\n|\r")
+
+def load_file(file, parallel=True):
     """
     Load and parse a supported log file into a DataFrame.
-    Supports TSMC-style logs and McScript/McAfee logs.
+    Supports TSMC-style logs and McScript/McAfee logs; the format is picked
+    from the file's content. gzip, bzip2 and xz files are recognized by
+    their magic bytes and decompressed as a stream (see utils.compression);
+    zip and tar archives are parsed member by member (see utils.archive).
+    Files larger than SPLIT_THRESHOLD are split at newlines and parsed in
+    the process pool (unless `parallel` is False or the pool has a single
+    worker, see utils.parallel.pool_enabled); files larger than
+    STREAM_THRESHOLD are otherwise parsed block by block so the raw bytes,
+    decoded text and line list never exist for the whole file at once.
     """
-    name = file.name.lower()
-    content = file.read().decode(errors="ignore").splitlines()
+    from utils import archive, compression
+    from utils.parallel import pool_enabled
+    parallel = parallel and pool_enabled()
+    kind = archive.detect(file)
+    if kind:
+        return archive.load_archive(file, kind, parallel)
+    opener = compression.detect(registry.peek(file, compression.MAGIC_BYTES))
+    if opener:
+        return compression.load_compressed(file, opener, parallel)
+    spec = pick_format(file)
+    if spec.file_target:
+        return spec.load_file()(file)
+    size = file_size(file)
+    if parallel and size > SPLIT_THRESHOLD:
+        from utils.parallel import parse_split
+        return parse_split(file, spec, size)
+    if size > STREAM_THRESHOLD:
+        return concat_events(list(iter_file_chunks(file, spec=spec)))
+    return parse_buffer(spec, file.read())
 
-    if "mcscript" in name or "mcafee" in name:
-        return parse_mcscript(content)
-    elif "tsmc" in name or "tp" in name or ".tsm" in name:
-        return parse_tsmc(content)
+def server_log_paths(pattern, roots=None):
+    """
+    Files matching the path or glob `pattern` that lie inside one of
+    `roots` (SERVER_LOG_ROOTS by default). Relative patterns are matched
+    under each root; every match is resolved, symlinks included, and
+    dropped unless it is a file within a root.
+    """
+    roots = [Path(root).resolve() for root in (SERVER_LOG_ROOTS if roots is None else roots) if root]
+    pattern = pattern.strip()
+    if not pattern or not roots:
+        return []
+    if os.path.isabs(pattern):
+        matches = glob(pattern)
     else:
-        return parse_generic(content)
+        matches = [match for root in roots for match in glob(os.path.join(root, pattern))]
+    paths = {}
+    for match in matches:
+        path = Path(match).resolve()
+        if path.is_file() and any(path.is_relative_to(root) for root in roots):
+            paths.setdefault(path, None)
+    return sorted(paths)
+
+def load_path(path, parallel=True):
+    """
+    Parse a log file already on the server's disk. The file is memory-mapped
+    read-only and the bytes-level parsers scan the mapping in place, so
+    nothing is copied up front and repeat runs are served from the page
+    cache. The mapping and its handle are closed before returning.
+    Compressed files, archives and formats read as a whole file (CSV) go
+    through `load_file` instead.
+    Large files are split across the process pool as in `load_file`; each
+    worker maps the file itself and parses only its own span.
+    """
+    from utils import archive, compression
+    from utils.parallel import pool_enabled
+    parallel = parallel and pool_enabled()
+    path = Path(path)
+    with map_file(path) as data:
+        head = data[:registry.SNIFF_BYTES]
+        spec = registry.sniff(head, path.name)
+        if compression.detect(head) or archive.detect_head(head[:archive.TAR_HEAD]) or spec.file_target:
+            with open(path, "rb") as handle:
+                return load_file(handle, parallel)
+        if parallel and len(data) > SPLIT_THRESHOLD:
+            from utils.parallel import parse_split_path
+            return parse_split_path(path, spec, data)
+        if not spec.bytes_target and len(data) > STREAM_THRESHOLD:
+            # The line parsers need decoded text, so keep that per block
+            return concat_events([parse_buffer(spec, data[start:end]) for start, end in newline_spans(data, STREAM_BLOCK_SIZE)])
+        return parse_buffer(spec, data)
+
+@contextmanager
+def map_file(path):
+    """
+    Read-only memory map of the file at `path` (b"" for an empty file,
+    which cannot be mapped). The map and the file handle are closed on exit.
+    """
+    with open(path, "rb") as handle:
+        if not os.fstat(handle.fileno()).st_size:
+            yield b""
+            return
+        with mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            yield data
+
+def newline_spans(data, piece_size):
+    """
+    (start, end) offsets cutting `data` into pieces of at least `piece_size`
+    bytes that each end right after a line break (except possibly the last),
+    the in-place counterpart of `iter_newline_pieces`.
+    """
+    spans = []
+    start = 0
+    while start < len(data):
+        m = LINE_BREAK_RE.search(data, start + piece_size)
+        end = m.end() if m else len(data)
+        spans.append((start, end))
+        start = end
+    return spans
+
+def iter_file_chunks(file, block_size=STREAM_BLOCK_SIZE, spec=None):
+    """
+    Stream a log file as parsed DataFrame chunks, one per newline-aligned
+    piece of about `block_size` bytes. Peak memory follows the block size,
+    not the file.
+    """
+    spec = spec or pick_format(file)
+    for piece in iter_newline_pieces(file, block_size):
+        df = parse_buffer(spec, piece)
+        if not df.empty:
+            yield df
+
+def iter_newline_pieces(file, piece_size):
+    """
+    Read `file` in pieces of about `piece_size` bytes that each end right
+    after a line break (except possibly the last). Line breaks are ASCII and
+    never occur inside a UTF-8 character, so each piece decodes and splits
+    on its own. A "\r" that ends a block may be half of a "\r\n" pair, so
+    the cut is never made there.
+    """
+    carry = b""
+    while True:
+        block = file.read(piece_size)
+        if not block:
+            if carry:
+                yield carry
+            return
+        block = carry + block
+        cut = block.rfind(b"\n") + 1 or block.rfind(b"\r", 0, len(block) - 1) + 1
+        carry = block[cut:]
+        if cut:
+            yield block[:cut]
+
+def parse_buffer(spec, data):
+    """
+    Parse an in-memory buffer (bytes or a memory map) with the format's
+    bytes-level parser when it has one, otherwise decode it and run the
+    line parser. Whole-file formats get the buffer as a file.
+    """
+    if spec.file_target:
+        return spec.load_file()(io.BytesIO(bytes(data)))
+    if spec.bytes_target:
+        return spec.load_bytes()(data)
+    return spec.load()(str(data, "utf-8", "ignore").splitlines())
+
+class PieceReader(io.RawIOBase):
+    """
+    Read-only, non-seekable file over an iterator of byte pieces, so a
+    stream produced block by block (e.g. while decompressing) can be
+    handed to a parser that expects a file. Wrap it in io.BufferedReader.
+    """
+
+    def __init__(self, pieces):
+        self._pieces = iter(pieces)
+        self._view = memoryview(b"")
+
+    def readable(self):
+        return True
+
+    def readinto(self, buffer):
+        while not len(self._view):
+            piece = next(self._pieces, None)
+            if piece is None:
+                return 0
+            self._view = memoryview(piece)
+        size = min(len(buffer), len(self._view))
+        buffer[:size] = self._view[:size]
+        self._view = self._view[size:]
+        return size
+
+def pick_format(file):
+    """
+    Choose the format of a file by scoring its first 64 KB against every
+    registered format (see utils.registry); the file is rewound.
+    """
+    return registry.sniff(registry.peek(file), file.name)
+
+def parse_lines(lines, name="", block_lines=LINE_BLOCK):
+    """
+    Parse text lines pulled out of a document (spreadsheet rows, PDF or
+    Word text) with the line parser of the format their first 64 KB look
+    like. `lines` may be any iterable; it is consumed `block_lines` lines
+    at a time, so a lazily produced document never exists as one list.
+    """
+    lines = iter(lines)
+    block = list(islice(lines, block_lines))
+    head = "\n".join(block[:registry.SNIFF_BYTES // 16]).encode(errors="ignore")[:registry.SNIFF_BYTES]
+    parse = registry.sniff(head, name).load()
+    frames = []
+    while block:
+        frames.append(parse(block))
+        block = list(islice(lines, block_lines))
+    return concat_events(frames)
+
+def concat_events(frames):
+    """
+    Concatenate parsed chunks. Date columns that were all-None in some chunks
+    are turned back into datetime columns. Date columns whose chunks hold
+    values of different kinds (another resolution, or Timestamps kept as
+    objects) are joined as objects and inferred again, so the result is
+    what parsing all the lines at once gives.
+    """
+    frames = [df for df in frames if not df.empty]
+    if not frames:
+        return pd.DataFrame()
+    mixed = [
+        col for col in DATE_COLUMNS
+        if len({df[col].dtype for df in frames if col in df.columns and df[col].notna().any()}) > 1
+    ]
+    if mixed:
+        frames = [df.assign(**{col: _date_objects(df[col]) for col in mixed if col in df.columns}) for df in frames]
+    events = pd.concat(frames, ignore_index=True)
+    for col in mixed:
+        events[col] = pd.Series(events[col].to_numpy(dtype=object), index=events.index)
+    return events.infer_objects()
+
+def _date_objects(values):
+    values = values.astype(object)
+    return values.where(values.notna(), None)
+
+def file_size(file):
+    """Size of an open file-like object in bytes, without moving its position."""
+    size = getattr(file, "size", None)
+    if size is not None:
+        return size
+    pos = file.tell()
+    size = file.seek(0, io.SEEK_END)
+    file.seek(pos)
+    return size - pos
+
+# Every field is a run of whitespace or non-whitespace, so the match never
+# backtracks: ts, level, then the first tokens after the level and the rest
+MCSCRIPT_RE = re.compile(r"^(\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2})\s+([IWEC])(\s+)(\S+)(\s*)(\S*)(\s*)(.*)")
+MCSCRIPT_STAMP_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+SEVERITY_CODES = ["I", "W", "E", "C"]
+SEVERITY_LABELS = np.array(["Info", "Warning", "Error", "Critical"], dtype=object)
 
 def parse_mcscript(lines):
     """
     Parse McScript/McAfee agent logs.
-    Expected format: YYYY-MM-DD HH:MM:SS <level> ...
-    """
-    events = []
-    for line in lines:
-        m = re.match(r"(\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2})\s+([IWEC])\s+.*?\s+(\S+)\s+(.*)", line)
-        if m:
-            ts, sev, src, msg = m.groups()
-            events.append({
-                "Raise Date": pd.to_datetime(ts, errors="coerce"),
-                "Severity": severity_map(sev),
-                "Device Name": None,
-                "Alarm Name": src,
-                "Status": None,
-                "Message": msg.strip(),
-                "Terminated Date": None
-            })
-    return pd.DataFrame(events)
+    Expected format: YYYY-MM-DD HH:MM:SS <level> <module> <source> <message>
+    Fields for the whole file come from one compiled, linear-time extract;
+    the source is normally the second token after the level, or the first
+    one when the line is too short to have both.
+    """
+    return parse_mcscript_rows(lines)[0]
+
+def parse_mcscript_rows(lines):
+    """
+    parse_mcscript, also returning the index of the line behind each event
+    (lines that do not match the format produce no event).
+    """
+    if not len(lines):
+        return pd.DataFrame(), np.zeros(0, dtype=np.int64)
+    fields = pd.Series(lines, dtype=object).str.extract(MCSCRIPT_RE)
+    fields = fields[fields[0].notna()]
+    if fields.empty:
+        return pd.DataFrame(), np.zeros(0, dtype=np.int64)
+    wide_lead = fields[2].str.len().to_numpy() > 1
+    ts, sev, first, gap, second, tail, rest = (fields[i].to_numpy(dtype=object) for i in (0, 1, 3, 4, 5, 6, 7))
+    keep, full = mcscript_layout(wide_lead, gap.astype(bool), second.astype(bool), tail.astype(bool))
+    codes = pd.Categorical(sev[keep], categories=SEVERITY_CODES).codes
+    alarm = np.where(full, second, first)[keep]
+    message = pd.Series(np.where(full, rest, second)[keep], dtype=object).str.strip()
+    rows = fields.index.to_numpy()[keep]
+    return mcscript_events(ts[keep], codes, alarm, message.to_numpy(dtype=object)), rows
+
+def mcscript_layout(wide_lead, gap, second, tail):
+    """
+    Decide, per extracted McScript line, which token is the source.
+    Returns (keep, full): `full` marks "<level> <module> <source> <message>"
+    lines; the other kept lines are two-token lines where the level was
+    followed by more than one blank, so the first token is the source.
+    """
+    full = gap & second & tail
+    return full | (gap & wide_lead), full
+
+def mcscript_events(ts, codes, alarm, message):
+    """Build the McScript events frame from per-line stamps, severity codes, sources and messages."""
+    if not len(ts):
+        return pd.DataFrame()
+    events = EventColumns()
+    for col in ("Device Name", "Status", "Terminated Date"):
+        events.constant(col, None)
+    # strptime rolls a ":60" second over instead of rejecting it
+    ts = pd.Series(ts, dtype=object)
+    ts = ts.where(ts.str[17:19] < "60")
+    events.add(len(ts), {
+        "Raise Date": pd.to_datetime(ts, format=MCSCRIPT_STAMP_FORMAT, errors="coerce").to_numpy(),
+        "Severity": SEVERITY_LABELS[codes],
+        "Alarm Name": alarm,
+        "Message": message,
+    })
+    return events.to_frame()
+
+TSMC_STAMP_RE = re.compile(r"/(\d{8})/(\d{2}:\d{2}:\d{2}\.\d+)")
+TSMC_ALARM_RE = re.compile(r"Alarm\s+([^\s]+)")
 
 def parse_tsmc(lines):
     """
     Parse TSMC-style logs.
     Recognizes 'Alarm XYZ has been raised/terminated' and general messages.
+    Works on the whole file at once: one Series of lines, compiled str.extract
+    passes for the stamp and alarm name, and one fixed-format to_datetime
+    call per date column.
     """
-    events = []
-    for line in lines:
-        # Match timestamp at end of line
-        ts_match = re.search(r"/(\d{8})/(\d{2}:\d{2}:\d{2}\.\d+)", line)
-        timestamp = None
-        if ts_match:
-            date_str, time_str = ts_match.groups()
-            try:
-                timestamp = pd.to_datetime(date_str + " " + time_str, format="%Y%m%d %H:%M:%S.%f")
-            except:
-                timestamp = None
-
-        # Alarm raised
-        if "Alarm" in line and "raised" in line.lower():
-            m = re.search(r"Alarm\s+([^\s]+)", line)
-            alarm = m.group(1) if m else None
-            events.append({
-                "Raise Date": timestamp,
-                "Severity": "Warning",
-                "Device Name": None,
-                "Alarm Name": alarm,
-                "Status": "Raised",
-                "Message": line.strip(),
-                "Terminated Date": None
-            })
-
-        # Alarm terminated
-        elif "Alarm" in line and "terminated" in line.lower():
-            m = re.search(r"Alarm\s+([^\s]+)", line)
-            alarm = m.group(1) if m else None
-            events.append({
-                "Raise Date": None,
-                "Severity": "Info",
-                "Device Name": None,
-                "Alarm Name": alarm,
-                "Status": "Terminated",
-                "Message": line.strip(),
-                "Terminated Date": timestamp
-            })
-
-        # Generic message
-        else:
-            events.append({
-                "Raise Date": timestamp,
-                "Severity": "Info",
-                "Device Name": None,
-                "Alarm Name": None,
-                "Status": None,
-                "Message": line.strip(),
-                "Terminated Date": None
-            })
-    return pd.DataFrame(events)
+    if not len(lines):
+        return pd.DataFrame()
+    text = pd.Series(lines, dtype=object)
+
+    # Match timestamp anywhere in line
+    stamps = text.str.extract(TSMC_STAMP_RE)
+    stamp = (stamps[0] + " " + stamps[1]).to_numpy(dtype=object)
+
+    # Classify raised / terminated / generic rows; only lines mentioning
+    # "Alarm" are lowercased and searched for the alarm name
+    has_alarm = text.str.contains("Alarm", regex=False).to_numpy(dtype=bool)
+    lowered = text[has_alarm].str.lower()
+    raised = np.zeros(len(text), dtype=bool)
+    terminated = np.zeros(len(text), dtype=bool)
+    raised[has_alarm] = lowered.str.contains("raised", regex=False).to_numpy(dtype=bool)
+    terminated[has_alarm] = lowered.str.contains("terminated", regex=False).to_numpy(dtype=bool)
+    terminated &= ~raised
+    alarm_rows = raised | terminated
+
+    alarm = np.full(len(text), None, dtype=object)
+    names = text[alarm_rows].str.extract(TSMC_ALARM_RE)[0]
+    alarm[alarm_rows] = names.where(names.notna(), None).to_numpy(dtype=object)
+    raise_date, terminated_date = tsmc_dates(stamp, terminated)
+    return tsmc_events(raise_date, terminated_date, raised, terminated, alarm, text.str.strip().to_numpy(dtype=object))
+
+def tsmc_dates(stamp, terminated):
+    """
+    Convert "YYYYMMDD HH:MM:SS.f" stamps (or missing) into the Raise Date
+    and Terminated Date columns. Raise and terminate stamps land in
+    different columns, so each column is converted in one fixed-format
+    call over its own rows.
+    """
+    stamp = pd.Series(stamp, dtype=object)
+    return tsmc_column(stamp.where(~terminated)), tsmc_column(stamp.where(terminated))
+
+def tsmc_column(stamp):
+    """
+    One date column from a Series of "YYYYMMDD HH:MM:SS.f" stamps (or
+    missing), converted in one fixed-format call. A column cannot hold a
+    year outside datetime64[ns] next to a nanosecond fraction, so stamps
+    refused by the bulk call are parsed one by one; if any of them does
+    parse, the column holds the values as objects, like the per-line
+    parser gave.
+    """
+    converted = pd.to_datetime(stamp, format=TSMC_STAMP_FORMAT, errors="coerce")
+    leftover = (stamp.notna() & converted.isna()).to_numpy()
+    if not leftover.any():
+        return converted
+    retried = pd.Series(STAMP_CACHE.get_many(stamp[leftover], TSMC_STAMP_FORMAT), dtype=object)
+    if retried.isna().all():
+        return converted
+    values = converted.astype(object)
+    values[leftover] = retried.to_numpy()
+    return values.where(values.notna(), None).to_numpy(dtype=object)
+
+def tsmc_events(raise_date, terminated_date, raised, terminated, alarm, message):
+    """
+    Build the TSMC events frame from per-line columns: both date columns,
+    raised/terminated masks, the alarm name for alarm lines and the
+    stripped message.
+    """
+    status = np.where(raised, "Raised", np.where(terminated, "Terminated", None))
+    events = EventColumns()
+    events.constant("Device Name", None)
+    events.add(len(message), {
+        "Raise Date": raise_date,
+        "Severity": np.where(raised, "Warning", "Info").astype(object),
+        "Alarm Name": alarm,
+        "Status": status,
+        "Message": message,
+        "Terminated Date": terminated_date,
+    })
+    return events.to_frame()
+
+GENERIC_STAMP_RE = re.compile(r"^(\d{4}[-/]\d{2}[-/]\d{2}[ T]\d{2}:\d{2}:\d{2})")
 
 def parse_generic(lines):
     """
     Fallback parser for unknown formats — extracts datetime and message.
+    The stamp layout is inferred once per file from a sample and the whole
+    column is converted with that explicit format. Stamps that do not fit
+    get the next most common layout; only the odd ones left over are parsed
+    one by one.
     """
-    events = []
-    for line in lines:
-        ts = None
-        m = re.match(r"(\d{4}[-/]\d{2}[-/]\d{2}[ T]\d{2}:\d{2}:\d{2})", line)
-        if m:
-            try:
-                ts = pd.to_datetime(m.group(1))
-            except:
-                ts = None
-        events.append({
-            "Raise Date": ts,
-            "Severity": None,
-            "Device Name": None,
-            "Alarm Name": None,
-            "Status": None,
-            "Message": line.strip(),
-            "Terminated Date": None
-        })
-    return pd.DataFrame(events)
+    if not len(lines):
+        return pd.DataFrame()
+    text = pd.Series(lines, dtype=object)
+    stamp = text.str.extract(GENERIC_STAMP_RE)[0]
+    matched = stamp.notna().to_numpy()
+
+    # strptime rolls a ":60" second over instead of rejecting it, so those
+    # stamps are left to the one-by-one parse
+    pending = matched & (stamp.str[17:19] < "60").fillna(False).to_numpy(dtype=bool)
+    raise_date = pd.Series(pd.NaT, index=stamp.index, dtype="datetime64[s]")
+    tried = set()
+    while pending.any():
+        fmt = infer_stamp_format(stamp[pending], exclude=tried)
+        if fmt is None:
+            break
+        tried.add(fmt)
+        converted = pd.to_datetime(stamp.where(pending), format=fmt, errors="coerce")
+        hit = converted.notna().to_numpy()
+        raise_date = converted.where(hit, raise_date)
+        pending &= ~hit
+
+    leftover = matched & raise_date.isna().to_numpy()
+    if leftover.any():
+        raise_date = raise_date.astype(object)
+        raise_date[leftover] = STAMP_CACHE.get_many(stamp[leftover])
+        raise_date = raise_date.where(raise_date.notna(), None).tolist()
+
+    events = EventColumns()
+    for col in ("Severity", "Device Name", "Alarm Name", "Status", "Terminated Date"):
+        events.constant(col, None)
+    events.add(len(text), {
+        "Raise Date": raise_date,
+        "Message": text.str.strip().to_numpy(dtype=object),
+    })
+    return events.to_frame()
 
 def severity_map(code):
     return {"I": "Info", "W": "Warning", "E": "Error", "C": "Critical"}.get(code, "Info")
 
 def clean_events(df):
     """
-    Ensure required columns exist, fill missing with None, and sort by date.
+    Ensure required columns exist, fill missing with None, cast to the
+    typed event schema (see utils.schema.type_events) and sort by date.
     """
     expected_cols = ["Device Name", "Alarm Name", "Severity", "Status", "Raise Date", "Terminated Date", "Message", "source_file"]
     for col in expected_cols:
         if col not in df.columns:
             df[col] = None
+    df = type_events(df)
     if "Raise Date" in df.columns:
         df = df.sort_values("Raise Date", na_position="last")
     return df
@@ -144,8 +494,9 @@ def generate_summary(df):
 
     period = f"{df['Raise Date'].min()} to {df['Raise Date'].max()}"
     total = len(df)
-    critical_count = len(df[df["Severity"].str.lower().isin(["critical", "error"], na=False)]) if "Severity" in df.columns else 0
-    top_alarms = df["Alarm Name"].value_counts().head(3).to_dict() if "Alarm Name" in df.columns else {}
+    critical_count = int(filters.isin(df["Severity"], ["critical", "error"], case=False).sum()) if "Severity" in df.columns else 0
+    counts = df["Alarm Name"].value_counts() if "Alarm Name" in df.columns else pd.Series(dtype=int)
+    top_alarms = counts[counts > 0].head(3).to_dict()
     return f"Period: {period}\nTotal Events: {total}\nCritical Events: {critical_count}\nTop Alarms: {top_alarms}"
 
 
@@ -0,0 +1,87 @@
+# utils/pdf_parser.py
+
+import io
+
+import pdfplumber
+
+from utils.cache import LRUCache, content_hash
+from utils.parser import concat_events, parse_lines
+from utils.schema import table_to_events
+
+# Characters of extracted page text kept across runs
+PDF_CACHE_CHARS = 64 * 1024 * 1024
+# Page batches per pool worker; each task opens the document once
+PDF_TASKS_PER_WORKER = 2
+
+
+def page_weight(page):
+    lines, tables = page
+    return sum(map(len, lines)) + sum(len(cell or "") for table in tables for row in table for cell in row)
+
+
+# (document hash, page number) -> (text lines, tables) for pages already
+# extracted, so re-opening a report skips the layout analysis
+PAGE_CACHE = LRUCache(PDF_CACHE_CHARS, weigh=page_weight)
+
+
+def parse_pdf(file):
+    """
+    Parse a PDF report. Pages not yet in PAGE_CACHE are extracted with
+    pdfplumber in batches across the process pool. Text outside tables
+    goes to the line parser of the format it looks like. Tables whose
+    header maps onto the event schema become events column-wise; other
+    tables are read as lines of text.
+    """
+    data = file.read()
+    digest = content_hash(data)
+    with pdfplumber.open(io.BytesIO(data)) as pdf:
+        count = len(pdf.pages)
+    pages = [PAGE_CACHE.get((digest, number)) for number in range(count)]
+    missing = [number for number, page in enumerate(pages) if page is None]
+    if missing:
+        from utils.parallel import POOL_WORKERS, map_calls
+        size = -(-len(missing) // (POOL_WORKERS * PDF_TASKS_PER_WORKER))
+        batches = [missing[i:i + size] for i in range(0, len(missing), size)]
+        results = map_calls("utils.pdf_parser:extract_pages", [(data, batch) for batch in batches])
+        for batch, extracted in zip(batches, results):
+            for number, page in zip(batch, extracted):
+                PAGE_CACHE.put((digest, number), page)
+                pages[number] = page
+
+    lines = []
+    frames = []
+    for text, tables in pages:
+        lines.extend(text)
+        for table in tables:
+            events = table_to_events(table)
+            if events is None:
+                lines.extend(" ".join(cell for cell in row if cell) for row in table)
+            else:
+                frames.append(events)
+    return concat_events([parse_lines(lines, getattr(file, "name", "") or "")] + frames)
+
+
+def extract_pages(data, numbers):
+    """
+    Text lines outside tables and the tables (rows of cell strings) of the
+    given pages of a PDF document.
+    """
+    pages = []
+    with pdfplumber.open(io.BytesIO(data)) as pdf:
+        for number in numbers:
+            page = pdf.pages[number]
+            found = page.find_tables()
+            boxes = [table.bbox for table in found]
+            outside = page.filter(lambda obj: not any(_centered_in(obj, box) for box in boxes)) if boxes else page
+            text = outside.extract_text() or ""
+            pages.append((text.splitlines(), [table.extract() for table in found]))
+            page.close()
+    return pages
+
+
+def _centered_in(obj, box):
+    # Objects are assigned to a table by their centre, so a line of text
+    # grazing a table's edge is kept whole
+    x = (obj["x0"] + obj["x1"]) / 2
+    y = (obj["top"] + obj["bottom"]) / 2
+    return box[0] <= x <= box[2] and box[1] <= y <= box[3]
@@ -0,0 +1,185 @@
+# utils/registry.py
+
+import importlib
+import re
+from dataclasses import dataclass
+from typing import Callable, Optional
+
+from utils.schema import is_event_mapping, map_headers
+
+SNIFF_BYTES = 64 * 1024
+# Score added when the file name points at a format
+NAME_HINT = 0.1
+
+
+@dataclass(frozen=True)
+class ParserSpec:
+    """
+    One registered log format. `probe` scores the first SNIFF_BYTES of a
+    file (plus its name) between 0 and 1; `target` names the line parser as
+    "module:function" and is only imported once the format is picked.
+    `bytes_target` optionally names a parser that takes the raw buffer.
+    `file_target` optionally names a parser that takes the whole open file,
+    for formats with a header or container that cannot be cut into
+    line-aligned pieces; it takes precedence over the other two.
+    `spreads` marks parsers that spread their own work across the process
+    pool, so they are called in the main process rather than in a worker.
+    """
+    name: str
+    target: str
+    probe: Callable[[bytes, str], float]
+    bytes_target: Optional[str] = None
+    file_target: Optional[str] = None
+    spreads: bool = False
+
+    def load(self):
+        return resolve(self.target)
+
+    def load_bytes(self):
+        return resolve(self.bytes_target)
+
+    def load_file(self):
+        return resolve(self.file_target)
+
+
+def resolve(target):
+    """Import the function named by a "module:function" target."""
+    module, _, attr = target.partition(":")
+    return getattr(importlib.import_module(module), attr)
+
+
+PARSERS = []
+
+
+def register(name, target, probe, bytes_target=None, file_target=None, spreads=False):
+    """Add a format to the registry; earlier entries win ties."""
+    spec = ParserSpec(name, target, probe, bytes_target, file_target, spreads)
+    PARSERS.append(spec)
+    return spec
+
+
+def sniff(head, name=""):
+    """Pick the best-scoring format for a file from its head bytes and name."""
+    # Drop the last, probably cut-off line
+    cut = head.rfind(b"\n")
+    if cut > 0 and len(head) >= SNIFF_BYTES:
+        head = head[:cut]
+    name = name.lower()
+    return max(PARSERS, key=lambda spec: spec.probe(head, name))
+
+
+def peek(file, size=SNIFF_BYTES):
+    """Read the first `size` bytes of `file` and rewind it."""
+    pos = file.tell()
+    head = file.read(size)
+    file.seek(pos)
+    return head
+
+
+def file_head(file, size=SNIFF_BYTES):
+    """
+    First bytes of `file` without consuming them, for seekable files and
+    non-seekable buffered streams (decompressed or archive members) alike.
+    """
+    if hasattr(file, "peek") and not file.seekable():
+        return file.peek(size)[:size]
+    return peek(file, size)
+
+
+def line_share(pattern, head):
+    """Fraction of non-blank lines in `head` that `pattern` matches."""
+    lines = [line for line in head.splitlines() if line.strip()]
+    if not lines:
+        return 0.0
+    return sum(1 for line in lines if pattern.search(line)) / len(lines)
+
+
+TSMC_PROBE_RE = re.compile(rb"/\d{8}/\d{2}:\d{2}:\d{2}\.\d|Alarm\s+\S+.*(?i:raised|terminated)")
+NDJSON_PROBE_RE = re.compile(rb"^\s*\{.*\}\s*$")
+OFFICE_MAGIC = b"PK\x03\x04"
+CSV_DELIMITERS = [",", ";", "\t", "|"]
+MCSCRIPT_PROBE_RE = re.compile(rb"^\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2}\s+[IWEC]\s")
+
+
+def probe_tsmc(head, name):
+    hint = NAME_HINT if "tsmc" in name or ".tsm" in name else 0.0
+    return line_share(TSMC_PROBE_RE, head) + hint
+
+
+def probe_mcscript(head, name):
+    hint = NAME_HINT if "mcscript" in name or "mcafee" in name else 0.0
+    return line_share(MCSCRIPT_PROBE_RE, head) + hint
+
+
+def guess_delimiter(line):
+    """The CSV delimiter used most often in a header line."""
+    return max(CSV_DELIMITERS, key=line.count)
+
+
+def probe_csv(head, name):
+    # A first line whose fields name at least two event columns, one of
+    # them a date or message
+    hint = NAME_HINT if name.endswith((".csv", ".tsv")) else 0.0
+    header = head.split(b"\n", 1)[0].decode(errors="ignore").strip()
+    if not header:
+        return hint
+    fields = [field.strip().strip('"') for field in header.split(guess_delimiter(header))]
+    mapping = map_headers(fields)
+    return (0.9 if len(mapping) >= 2 and is_event_mapping(mapping) else 0.0) + hint
+
+
+def probe_office(head, name, part, suffixes):
+    # Office documents are zip packages; `part` is the folder holding the
+    # document itself ("xl/", "word/"), whose entries come first
+    if not head.startswith(OFFICE_MAGIC):
+        return 0.0
+    if part in head:
+        return 1.0
+    return 0.9 if name.endswith(suffixes) else 0.0
+
+
+def probe_xlsx(head, name):
+    return probe_office(head, name, b"xl/", (".xlsx", ".xlsm"))
+
+
+def probe_docx(head, name):
+    return probe_office(head, name, b"word/", (".docx", ".docm"))
+
+
+def probe_ndjson(head, name):
+    hint = NAME_HINT if name.endswith((".ndjson", ".jsonl")) else 0.0
+    return line_share(NDJSON_PROBE_RE, head) + hint
+
+
+def probe_json(head, name):
+    # A top-level array of records, or a (pretty-printed) object
+    hint = NAME_HINT if name.endswith(".json") else 0.0
+    head = head.lstrip()
+    if head.startswith(b"[") and head[1:].lstrip()[:1] in (b"{", b"]"):
+        return 0.9 + hint
+    if head.startswith(b"{"):
+        return 0.5 + hint
+    return hint
+
+
+def probe_pdf(head, name):
+    if head.startswith(b"%PDF-"):
+        return 1.0
+    return NAME_HINT if name.endswith(".pdf") else 0.0
+
+
+def probe_generic(head, name):
+    # Baseline every specific format has to beat
+    return 0.05
+
+
+register("generic", "utils.parser:parse_generic", probe_generic)
+register("mcscript", "utils.parser:parse_mcscript", probe_mcscript, "utils.bytes_parser:parse_mcscript_bytes")
+register("tsmc", "utils.parser:parse_tsmc", probe_tsmc, "utils.bytes_parser:parse_tsmc_bytes")
+# Whole-file formats fall back to the generic line parser for their text
+register("csv", "utils.parser:parse_generic", probe_csv, file_target="utils.csv_parser:parse_csv")
+register("xlsx", "utils.parser:parse_generic", probe_xlsx, file_target="utils.excel_parser:parse_xlsx", spreads=True)
+register("ndjson", "utils.json_parser:parse_ndjson", probe_ndjson)
+register("json", "utils.parser:parse_generic", probe_json, file_target="utils.json_parser:parse_json")
+register("docx", "utils.parser:parse_generic", probe_docx, file_target="utils.docx_parser:parse_docx")
+register("pdf", "utils.parser:parse_generic", probe_pdf, file_target="utils.pdf_parser:parse_pdf", spreads=True)
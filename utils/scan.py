@@ -0,0 +1,122 @@
+# utils/scan.py
+
+import re
+
+import numpy as np
+
+# Bytes that make a line's bytes-level parse differ from the decoded one:
+# anything non-ASCII, and the control characters str.splitlines() and the
+# str regex classes treat as line breaks or whitespace but bytes do not
+DIRTY_RE = re.compile(rb"[\x0b\x0c\x1c-\x1f\x80-\xff]")
+
+
+def line_bounds(data):
+    """
+    Start and end offsets (terminator excluded) of every line
+    `data.splitlines()` returns; lines end at b"\n", b"\r\n" or a lone b"\r".
+    """
+    arr = np.frombuffer(data, dtype=np.uint8)
+    breaks = np.flatnonzero(arr == 10)
+    ends = breaks
+    cr = np.flatnonzero(arr == 13)
+    if len(cr):
+        pair = arr[np.minimum(cr + 1, len(arr) - 1)] == 10
+        breaks = np.union1d(breaks, cr[~pair])
+        ends = breaks - np.isin(breaks, cr[pair] + 1)
+    starts = np.concatenate(([0], breaks + 1))
+    if starts[-1] == len(arr):
+        starts = starts[:-1]
+    else:
+        ends = np.concatenate((ends, [len(arr)]))
+    return starts, ends
+
+
+def line_starts(data):
+    """Offset of the first byte of every line `data.splitlines()` returns."""
+    return line_bounds(data)[0]
+
+
+def line_index(starts, offsets):
+    """Line number of each byte offset."""
+    return np.searchsorted(starts, offsets, side="right") - 1
+
+
+def bytes_at(data, offsets):
+    """Byte value at each offset, 0 past the end of `data`."""
+    arr = np.frombuffer(data, dtype=np.uint8)
+    offsets = np.asarray(offsets)
+    inside = offsets < len(arr)
+    return np.where(inside, arr[np.where(inside, offsets, 0)] if len(arr) else 0, 0)
+
+
+def find_all(data, literal):
+    """Offsets of every occurrence of `literal`, found with bytes.find."""
+    offsets = []
+    find = data.find
+    pos = find(literal)
+    while pos != -1:
+        offsets.append(pos)
+        pos = find(literal, pos + 1)
+    return np.array(offsets, dtype=np.int64)
+
+
+def stamp_markers(data):
+    """
+    Offsets of "/YYYYMMDD/" markers (a slash, eight ASCII digits and a
+    slash). Slashes are located with one vectorized byte comparison and the
+    shape is checked column by column on the survivors.
+    """
+    arr = np.frombuffer(data, dtype=np.uint8)
+    marks = np.flatnonzero(arr == ord("/"))
+    marks = marks[bytes_at(data, marks + 9) == ord("/")]
+    return keep_shape(data, marks, "/########/")
+
+
+def keep_shape(data, offsets, shape, start=0):
+    """
+    Keep the offsets where the bytes from `offset + start` on follow
+    `shape`: "#" stands for an ASCII digit, any other character for itself.
+    """
+    for k, want in enumerate(shape, start):
+        got = bytes_at(data, offsets + k)
+        if want == "#":
+            ok = (got >= ord("0")) & (got <= ord("9"))
+        else:
+            ok = got == ord(want)
+        offsets = offsets[ok]
+    return offsets
+
+
+def digit_run(data, offsets):
+    """Length of the run of ASCII digits starting at each offset."""
+    length = np.zeros(len(offsets), dtype=np.int64)
+    active = np.arange(len(offsets))
+    while len(active):
+        got = bytes_at(data, offsets[active] + length[active])
+        active = active[(got >= ord("0")) & (got <= ord("9"))]
+        length[active] += 1
+    return length
+
+
+def dirty_lines(data, starts):
+    """
+    Mask of lines that hold a byte from DIRTY_RE. Only the first such byte
+    per line is searched for, so the cost follows the dirty line count.
+    """
+    dirty = np.zeros(len(starts), dtype=bool)
+    search = DIRTY_RE.search
+    pos = 0
+    while True:
+        m = search(data, pos)
+        if m is None:
+            return dirty
+        line = int(line_index(starts, m.start()))
+        dirty[line] = True
+        if line + 1 >= len(starts):
+            return dirty
+        pos = int(starts[line + 1])
+
+
+def ends_with_break(data):
+    """Whether the last line of `data` has a line terminator."""
+    return data[-1:] in (b"\n", b"\r")
@@ -0,0 +1,247 @@
+# utils/schema.py
+
+import re
+
+import numpy as np
+import pandas as pd
+
+from utils.events import EVENT_COLUMNS, EventColumns
+from utils.timestamps import STAMP_CACHE
+
+# Header names (compared lowercased, without spaces, "_" or "-") that map
+# onto each event column. Extend these lists, or pass a mapping of your own
+# to `map_headers`, to bring other exports into the event schema.
+COLUMN_ALIASES = {
+    "Raise Date": ["raisedate", "raisetime", "raised", "date", "datetime", "time", "timestamp", "eventtime", "ts", "@timestamp", "occurred", "firstoccurrence", "starttime"],
+    "Severity": ["severity", "level", "loglevel", "priority", "sev"],
+    "Device Name": ["devicename", "device", "host", "hostname", "node", "equipment", "tool", "source"],
+    "Alarm Name": ["alarmname", "alarm", "alarmid", "alarmcode", "code", "event", "eventname", "eventid"],
+    "Status": ["status", "state"],
+    "Message": ["message", "msg", "description", "text", "details", "summary"],
+    "Terminated Date": ["terminateddate", "terminated", "cleared", "cleartime", "cleareddate", "endtime", "resolved"],
+}
+DATE_COLUMNS = ("Raise Date", "Terminated Date")
+# Typed event schema (see `type_events`): low-cardinality columns are
+# categoricals, free text is pandas' string dtype, dates are nanoseconds
+CATEGORY_COLUMNS = ("Severity", "Device Name", "Alarm Name", "Status", "source_file")
+TEXT_COLUMNS = ("Message",)
+DATE_DTYPE = "datetime64[ns]"
+EPOCH_MS_FLOOR = 1e11
+
+SEVERITY_ALIASES = {
+    "i": "Info", "info": "Info", "information": "Info", "informational": "Info", "notice": "Info",
+    "w": "Warning", "warn": "Warning", "warning": "Warning", "minor": "Warning",
+    "e": "Error", "err": "Error", "error": "Error", "major": "Error",
+    "c": "Critical", "crit": "Critical", "critical": "Critical", "fatal": "Critical",
+}
+
+_HEADER_NOISE_RE = re.compile(r"[\s_\-]+")
+
+
+def normalize_header(header):
+    return _HEADER_NOISE_RE.sub("", str(header)).lower()
+
+
+def map_headers(headers, aliases=None):
+    """
+    Map source headers onto event columns: {header: event column}. Each
+    event column takes the first header matching one of its aliases; an
+    exact event column name always wins.
+    """
+    aliases = COLUMN_ALIASES if aliases is None else aliases
+    normalized = {header: normalize_header(header) for header in headers}
+    mapping = {}
+    for column in EVENT_COLUMNS:
+        wanted = [normalize_header(column)] + [normalize_header(alias) for alias in aliases.get(column, [])]
+        for alias in wanted:
+            header = next((h for h, norm in normalized.items() if norm == alias and h not in mapping), None)
+            if header is not None:
+                mapping[header] = column
+                break
+    return mapping
+
+
+def is_event_mapping(mapping):
+    """Whether a header mapping carries enough to build events (a date or a message)."""
+    return bool({"Raise Date", "Message"} & set(mapping.values()))
+
+
+def frame_to_events(frame, mapping):
+    """
+    Build the events frame from a source table whose headers are mapped
+    by `mapping` (see `map_headers`). Date columns are parsed, severities
+    normalized to Info/Warning/Error/Critical where recognized and other
+    mapped columns kept as text.
+    """
+    events = EventColumns()
+    columns = {}
+    for header, column in mapping.items():
+        values = frame[header]
+        if column in DATE_COLUMNS:
+            columns[column] = to_dates(values)
+        elif column == "Severity":
+            columns[column] = normalize_severity(values)
+        else:
+            columns[column] = to_text(values)
+    for column in EVENT_COLUMNS:
+        if column not in columns:
+            events.constant(column, None)
+    events.add(len(frame), columns)
+    return events.to_frame()
+
+
+def table_to_events(rows, aliases=None):
+    """
+    Events from a table given as rows of cells whose first row is the
+    header, mapped column-wise onto the event schema; None when the header
+    does not map (see `is_event_mapping`).
+    """
+    if not rows:
+        return None
+    header = rows[0]
+    mapping = map_headers([cell for cell in header if cell is not None], aliases)
+    if not is_event_mapping(mapping):
+        return None
+    positions = {}
+    for i, cell in enumerate(header):
+        if cell in mapping and cell not in positions:
+            positions[cell] = i
+    body = rows[1:]
+    columns = {cell: [row[i] if i < len(row) else None for row in body] for cell, i in positions.items()}
+    return frame_to_events(pd.DataFrame(columns, index=pd.RangeIndex(len(body))).dropna(how="all"), mapping)
+
+
+def to_text(values):
+    """
+    Object column of strings with every missing value as None. Values that
+    are not strings already (numbers or dates from a spreadsheet cell) are
+    converted with str().
+    """
+    values = pd.Series(values).to_numpy(dtype=object, copy=True)
+    missing = pd.isna(values)
+    values[missing] = None
+    if pd.api.types.infer_dtype(values, skipna=True) not in ("string", "empty"):
+        present = ~missing
+        values[present] = [str(value) for value in values[present]]
+    return values
+
+
+def to_dates(values):
+    """
+    Parse a column of stamps. The layout is guessed once and applied to the
+    whole column; the few stamps in another layout are parsed one by one
+    through STAMP_CACHE. Values already holding dates are kept and numbers
+    are read as epoch stamps. Stamps with a UTC offset are converted to
+    UTC; the result is timezone-naive.
+    """
+    values = pd.Series(values)
+    if pd.api.types.is_datetime64_any_dtype(values):
+        return _naive(values).to_numpy()
+    if pd.api.types.is_numeric_dtype(values) and not pd.api.types.is_bool_dtype(values):
+        return _epoch(values).to_numpy()
+
+    values = pd.Series(to_text_or_number(values), dtype=object)
+    dates = pd.Series(pd.NaT, index=values.index, dtype="datetime64[ns]")
+    numbers = np.zeros(len(values), dtype=bool)
+    if pd.api.types.infer_dtype(values, skipna=True) not in ("string", "empty"):
+        numbers = np.fromiter(map(_is_number, values), dtype=bool, count=len(values))
+    if numbers.any():
+        dates[numbers] = _epoch(values[numbers].astype(float))
+    text = values.where(~numbers & values.notna())
+    if text.notna().any():
+        parsed = _naive(pd.to_datetime(text, errors="coerce", utc=True))
+        leftover = (text.notna() & parsed.isna()).to_numpy()
+        if leftover.any():
+            retried = pd.Series(STAMP_CACHE.get_many(text[leftover]), index=text.index[leftover], dtype=object)
+            parsed[leftover] = _naive(pd.to_datetime(retried, errors="coerce", utc=True))
+        dates = parsed.where(~numbers, dates) if numbers.any() else parsed
+    return dates.to_numpy()
+
+
+def to_text_or_number(values):
+    """Like `to_text`, except that numbers are kept as numbers."""
+    values = pd.Series(values).to_numpy(dtype=object, copy=True)
+    missing = pd.isna(values)
+    values[missing] = None
+    kind = pd.api.types.infer_dtype(values, skipna=True)
+    if kind not in ("string", "empty", "integer", "floating", "mixed-integer-float"):
+        present = ~missing
+        values[present] = [value if isinstance(value, str) or _is_number(value) else str(value) for value in values[present]]
+    return values
+
+
+def _is_number(value):
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+def _epoch(values):
+    # Epoch stamps in seconds or, past EPOCH_MS_FLOOR, milliseconds
+    unit = "ms" if values.abs().median() > EPOCH_MS_FLOOR else "s"
+    return pd.to_datetime(values, unit=unit, errors="coerce")
+
+
+def _naive(dates):
+    if getattr(dates.dt, "tz", None) is not None:
+        return dates.dt.tz_convert(None)
+    return dates
+
+
+def type_events(df):
+    """
+    Cast an events frame to the typed schema: CATEGORY_COLUMNS become
+    categoricals (an all-null column becomes one without categories, a
+    byte per row), TEXT_COLUMNS the string dtype and DATE_COLUMNS
+    datetime64[ns]. Other columns are left alone.
+    """
+    columns = {}
+    for col in df.columns:
+        if col in CATEGORY_COLUMNS and not isinstance(df[col].dtype, pd.CategoricalDtype):
+            columns[col] = pd.Categorical(to_text(df[col]))
+        elif col in TEXT_COLUMNS and df[col].dtype != "str":
+            columns[col] = pd.Series(to_text(df[col]), index=df.index, dtype="str")
+        elif col in DATE_COLUMNS and df[col].dtype != DATE_DTYPE:
+            columns[col] = to_event_dates(df[col])
+    return df.assign(**columns) if columns else df
+
+
+def to_event_dates(values):
+    """
+    datetime64[ns] column from parsed dates. Dates outside the range
+    nanoseconds can hold (years before 1678 or after 2261, only seen in
+    corrupt stamps) become NaT.
+    """
+    values = pd.Series(values)
+    if not pd.api.types.is_datetime64_any_dtype(values):
+        values = pd.to_datetime(values.astype(object), errors="coerce")
+    values = _naive(values)
+    if values.dtype != DATE_DTYPE:
+        values = values.where(values.between(pd.Timestamp.min, pd.Timestamp.max)).astype(DATE_DTYPE)
+    return values
+
+
+def unify_categories(frames):
+    """
+    Give each categorical column the same categories in every frame, so
+    that pd.concat keeps it categorical instead of falling back to object.
+    Only the integer codes are remapped.
+    """
+    frames = list(frames)
+    for col in CATEGORY_COLUMNS:
+        dtypes = [df[col].dtype for df in frames if col in df.columns]
+        if len(dtypes) < 2 or not all(isinstance(dtype, pd.CategoricalDtype) for dtype in dtypes):
+            continue
+        categories = pd.Index([]).append([dtype.categories.astype(object) for dtype in dtypes]).unique()
+        categories = categories.sort_values()
+        frames = [df.assign(**{col: df[col].cat.set_categories(categories)}) if col in df.columns and not df[col].cat.categories.equals(categories) else df for df in frames]
+    return frames
+
+
+def normalize_severity(values):
+    """
+    Known severity spellings and codes become Info/Warning/Error/Critical;
+    other values are kept. Each distinct value is looked up once.
+    """
+    codes, uniques = pd.factorize(to_text(values))
+    labels = [SEVERITY_ALIASES.get(str(value).strip().lower(), value) for value in uniques]
+    result = np.array(labels + [None], dtype=object)
+    return result[codes]
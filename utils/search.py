@@ -0,0 +1,211 @@
+# utils/search.py
+
+import re
+
+import numpy as np
+import pandas as pd
+
+# Columns covered by the full-text search
+SEARCH_COLUMNS = ("Message", "Alarm Name", "Device Name")
+# Tokens up to this many characters go into the trigram index; longer ones
+# (rare: paths, hex dumps) are scanned on every query
+TRIGRAM_MAX_TOKEN = 32
+# Tokens turned into trigrams at a time, bounding the code point matrix
+TRIGRAM_BLOCK = 65536
+
+_QUERY_TERM_RE = re.compile(r'-?"[^"]*"?|\S+')
+
+
+class SearchIndex:
+    """
+    Inverted index answering case-insensitive substring queries over the
+    text columns of an events frame, built once per dataset.
+
+    Every column is reduced to its distinct values (categoricals already
+    are) and each value is cut at whitespace into lowercase tokens; the
+    index maps tokens to the values holding them. A term without
+    whitespace occurs in a value exactly when it occurs inside one of its
+    tokens, so a term is answered by finding the tokens containing it,
+    narrowed down through a trigram index over the token vocabulary, and
+    taking the union of their postings. Matches are then broadcast to
+    rows through each column's codes. See `search` for the query syntax.
+    """
+
+    def __init__(self, df, columns=SEARCH_COLUMNS):
+        values = []
+        self._codes = []
+        offset = 0
+        for col in columns:
+            if col not in df.columns:
+                continue
+            codes, uniques = _factorize(df[col])
+            # Missing values point just past the last value, which never matches
+            self._codes.append((codes, offset))
+            values.append(np.asarray(uniques, dtype=object))
+            offset += len(uniques)
+        self.length = len(df)
+        self.values = np.concatenate(values) if values else np.empty(0, dtype=object)
+        for i, (codes, start) in enumerate(self._codes):
+            self._codes[i] = np.where(codes < 0, len(self.values), codes.astype(np.int32) + start).astype(np.int32)
+        self._build_postings()
+        self._build_trigrams()
+
+    @property
+    def nbytes(self):
+        arrays = [self._postings, self._posting_starts, self._trigram_keys, self._trigram_starts, self._trigram_tokens, *self._codes]
+        return sum(array.nbytes for array in arrays) + sum(len(token) for token in self.vocabulary) + sum(len(value) for value in self.values)
+
+    def search(self, query):
+        """
+        Boolean row mask for `query`. Terms are matched as case-insensitive
+        substrings of any indexed column; "quoted phrases" may contain
+        spaces. Terms next to each other must all match, OR separates
+        alternatives (binding looser than the implicit AND), and NOT or a
+        leading "-" excludes a term. A query with no terms matches nothing.
+        """
+        clauses = parse_query(query)
+        mask = np.zeros(self.length, dtype=bool)
+        for clause in clauses:
+            found = np.ones(self.length, dtype=bool)
+            for term, negated in clause:
+                rows = self.rows(self.match_values(term))
+                found &= ~rows if negated else rows
+            mask |= found
+        return mask
+
+    def rows(self, matched):
+        """Row mask from a boolean mask over the distinct values."""
+        matched = np.append(matched, False)
+        mask = np.zeros(self.length, dtype=bool)
+        for codes in self._codes:
+            mask |= matched[codes]
+        return mask
+
+    def match_values(self, term):
+        """Boolean mask over the distinct values containing `term` (lowercase)."""
+        pieces = term.split()
+        if not pieces:
+            return np.ones(len(self.values), dtype=bool)
+        matched = self._values_with(pieces[0])
+        for piece in pieces[1:]:
+            matched &= self._values_with(piece)
+        if term != pieces[0]:
+            # Every piece is present; check that they appear as the phrase,
+            # blanks included ("a12 " must be followed by a blank)
+            candidates = np.flatnonzero(matched)
+            text = pd.Series(self.values[candidates], dtype=object).str.lower()
+            matched[candidates] = text.str.contains(term, regex=False).to_numpy(dtype=bool)
+        return matched
+
+    def _values_with(self, piece):
+        tokens = self._tokens_with(piece)
+        matched = np.zeros(len(self.values), dtype=bool)
+        if len(tokens):
+            starts, ends = self._posting_starts[tokens], self._posting_starts[tokens + 1]
+            lengths = ends - starts
+            positions = np.repeat(starts - np.cumsum(lengths) + lengths, lengths) + np.arange(lengths.sum())
+            matched[self._postings[positions]] = True
+        return matched
+
+    def _tokens_with(self, piece):
+        """Ids of the vocabulary tokens containing `piece`."""
+        if len(piece) < 3:
+            candidates = np.arange(len(self.vocabulary))
+        else:
+            candidates = self._long_tokens
+            indexed = None
+            for key in np.unique(_trigram_keys(piece)):
+                i = np.searchsorted(self._trigram_keys, key)
+                if i == len(self._trigram_keys) or self._trigram_keys[i] != key:
+                    indexed = np.empty(0, dtype=np.int64)
+                    break
+                tokens = self._trigram_tokens[self._trigram_starts[i]:self._trigram_starts[i + 1]]
+                indexed = tokens if indexed is None else np.intersect1d(indexed, tokens, assume_unique=True)
+                if not len(indexed):
+                    break
+            candidates = np.concatenate([indexed, candidates])
+        if not len(candidates):
+            return candidates
+        found = pd.Series(self.vocabulary[candidates], dtype=object).str.contains(piece, regex=False).to_numpy(dtype=bool)
+        return candidates[found]
+
+    def _build_postings(self):
+        # Every token of every value, labelled with the value's id
+        tokens = pd.Series(self.values, dtype=object).str.lower().str.split().explode().dropna()
+        token_ids, vocabulary = pd.factorize(tokens.to_numpy(dtype=object))
+        # Group by token; the stable sort keeps each group's values ascending
+        order = np.argsort(token_ids, kind="stable")
+        token_ids, postings = token_ids[order], tokens.index.to_numpy(dtype=np.int32)[order]
+        keep = np.ones(len(postings), dtype=bool)
+        keep[1:] = (token_ids[1:] != token_ids[:-1]) | (postings[1:] != postings[:-1])
+        self.vocabulary = np.asarray(vocabulary, dtype=object)
+        self._postings = postings[keep]
+        self._posting_starts = np.searchsorted(token_ids[keep], np.arange(len(self.vocabulary) + 1))
+
+    def _build_trigrams(self):
+        lengths = np.fromiter(map(len, self.vocabulary), dtype=np.int64, count=len(self.vocabulary))
+        self._long_tokens = np.flatnonzero(lengths > TRIGRAM_MAX_TOKEN)
+        keys, tokens = [], []
+        for start in range(0, len(self.vocabulary), TRIGRAM_BLOCK):
+            block = self.vocabulary[start:start + TRIGRAM_BLOCK]
+            block_lengths = lengths[start:start + TRIGRAM_BLOCK]
+            short = np.flatnonzero((block_lengths >= 3) & (block_lengths <= TRIGRAM_MAX_TOKEN))
+            if not len(short):
+                continue
+            width = int(block_lengths[short].max())
+            points = np.array(block[short].tolist(), dtype=f"U{width}").view(np.uint32).reshape(len(short), width).astype(np.uint64)
+            grams = points[:, :-2] << np.uint64(42) | points[:, 1:-1] << np.uint64(21) | points[:, 2:]
+            valid = np.arange(width - 2) < (block_lengths[short] - 2)[:, None]
+            keys.append(grams[valid])
+            tokens.append(np.repeat(short + start, block_lengths[short] - 2))
+        keys = np.concatenate(keys) if keys else np.empty(0, dtype=np.uint64)
+        tokens = np.concatenate(tokens) if tokens else np.empty(0, dtype=np.int64)
+        # Group by trigram; the stable sort keeps each group's tokens ascending
+        order = np.argsort(keys, kind="stable")
+        keys, tokens = keys[order], tokens[order]
+        keep = np.ones(len(keys), dtype=bool)
+        keep[1:] = (keys[1:] != keys[:-1]) | (tokens[1:] != tokens[:-1])
+        keys, tokens = keys[keep], tokens[keep]
+        starts = np.flatnonzero(np.diff(keys, prepend=np.uint64(0)) != 0) if len(keys) else np.empty(0, dtype=np.int64)
+        if len(keys) and keys[0] == 0:
+            starts = np.insert(starts, 0, 0)
+        self._trigram_keys = keys[starts]
+        self._trigram_starts = np.append(starts, len(keys))
+        self._trigram_tokens = tokens
+
+
+def parse_query(query):
+    """
+    Clauses of (lowercase term, negated) pairs: the clauses are
+    alternatives (OR) and the terms of a clause must all hold (AND).
+    """
+    clauses, clause, negate = [], [], False
+    for raw in _QUERY_TERM_RE.findall(query):
+        if raw == "OR":
+            if clause:
+                clauses.append(clause)
+            clause, negate = [], False
+            continue
+        if raw == "NOT":
+            negate = True
+            continue
+        if raw.startswith("-") and len(raw) > 1:
+            negate, raw = True, raw[1:]
+        term = raw.strip('"').lower() if raw.startswith('"') else raw.lower()
+        if term.strip():
+            clause.append((term, negate))
+        negate = False
+    if clause:
+        clauses.append(clause)
+    return clauses
+
+
+def _factorize(values):
+    if isinstance(values.dtype, pd.CategoricalDtype):
+        return values.cat.codes.to_numpy(), values.cat.categories.astype(object)
+    return pd.factorize(values)
+
+
+def _trigram_keys(text):
+    points = np.array([text], dtype=f"U{len(text)}").view(np.uint32).astype(np.uint64)
+    return points[:-2] << np.uint64(42) | points[1:-1] << np.uint64(21) | points[2:]
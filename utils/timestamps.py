@@ -0,0 +1,188 @@
+# utils/timestamps.py
+
+import threading
+
+import numpy as np
+import pandas as pd
+from collections import Counter, OrderedDict
+from functools import lru_cache
+from itertools import islice
+
+STAMP_SAMPLE_SIZE = 1000
+STAMP_CACHE_SIZE = 65536
+
+TSMC_STAMP_FORMAT = "%Y%m%d %H:%M:%S.%f"
+# Stamps decoded per block, bounding the size of the uint8 matrix
+KERNEL_BLOCK = 65536
+# Years whose stamps fit int64 nanoseconds; others are left to pandas
+KERNEL_YEARS = (1678, 2261)
+
+_DAYS_IN_MONTH = np.array([31, 28, 31, 30, 31, 30, 31, 31, 30, 31, 30, 31])
+_FRACTION_SCALE = 10 ** np.arange(8, -1, -1, dtype=np.int64)
+
+
+class StampCache:
+    """
+    Bounded LRU memo from raw stamp strings to parsed Timestamps.
+
+    Chatty logs write many lines within the same second, so the value seen
+    just before is checked first, then the LRU table. Shared by all parsers
+    through STAMP_CACHE, including by parser threads, so it is
+    thread-safe; stamps are parsed outside the lock. `stats()` reports
+    the hit rate.
+    """
+
+    def __init__(self, maxsize=STAMP_CACHE_SIZE):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._table = OrderedDict()
+        # (key, value) of the last lookup, swapped as one object
+        self._last = (None, None)
+        self._lock = threading.Lock()
+
+    def get(self, raw, fmt=None):
+        """Parse `raw` (with `fmt`, or pandas' guessing when None) through the cache."""
+        key = (raw, fmt)
+        with self._lock:
+            last_key, value = self._last
+            if key == last_key:
+                self.hits += 1
+                return value
+            value = self._table.get(key)
+            if value is not None:
+                self.hits += 1
+                self._table.move_to_end(key)
+                self._last = (key, value)
+                return value
+            self.misses += 1
+        value = _parse(raw, fmt)
+        with self._lock:
+            self._table[key] = value
+            self._table.move_to_end(key)
+            if len(self._table) > self.maxsize:
+                self._table.popitem(last=False)
+            self._last = (key, value)
+        return value
+
+    def get_many(self, values, fmt=None):
+        """Parse an iterable of raw stamps; returns a list."""
+        return [self.get(raw, fmt) for raw in values]
+
+    @property
+    def hit_rate(self):
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def stats(self):
+        return {"hits": self.hits, "misses": self.misses, "size": len(self._table), "hit_rate": self.hit_rate}
+
+    def clear(self):
+        with self._lock:
+            self._table.clear()
+            self._last = (None, None)
+            self.hits = self.misses = 0
+
+
+STAMP_CACHE = StampCache()
+
+
+def infer_stamp_format(stamps, sample_size=STAMP_SAMPLE_SIZE, exclude=()):
+    """
+    Infer one strptime format for 'YYYY?MM?DD?HH:MM:SS' stamps from a sample.
+    Handles '-' vs '/' date separators and 'T' vs space before the time.
+    Returns the most common layout not in `exclude`, or None when no sampled
+    stamp uses a single date separator.
+    """
+    layouts = Counter((s[4], s[7], s[10]) for s in islice(stamps, sample_size))
+    for (sep, second_sep, joiner), _ in layouts.most_common():
+        fmt = f"%Y{sep}%m{sep}%d{joiner}%H:%M:%S"
+        if sep == second_sep and fmt not in exclude:
+            return fmt
+    return None
+
+
+def parse_stamp(value, fmt=None):
+    """Parse one stamp through the shared STAMP_CACHE; NaT when it cannot."""
+    return STAMP_CACHE.get(value, fmt)
+
+
+def _parse(value, fmt):
+    try:
+        return pd.to_datetime(value, format=fmt)
+    except (ValueError, OverflowError):
+        return pd.NaT
+
+
+def decode_tsmc_stamps(data, offsets, digits):
+    """
+    Decode '/YYYYMMDD/HH:MM:SS.f' stamps straight from the raw buffer.
+
+    `offsets` point at each stamp's leading slash and `digits` holds its
+    fraction length. The stamp bytes are viewed as a uint8 matrix and the
+    fields are computed arithmetically. Returns int64 nanoseconds since
+    the epoch and a validity mask. Stamps this kernel does not reproduce
+    exactly are marked invalid so the caller can hand them to pandas:
+    impossible dates, leap seconds (which strptime rolls over), more than
+    nine fraction digits and years outside KERNEL_YEARS.
+    """
+    arr = np.frombuffer(data, dtype=np.uint8)
+    offsets = np.asarray(offsets, dtype=np.int64)
+    digits = np.asarray(digits, dtype=np.int64)
+    nanos = np.zeros(len(offsets), dtype=np.int64)
+    valid = np.zeros(len(offsets), dtype=bool)
+    for lo in range(0, len(offsets), KERNEL_BLOCK):
+        hi = lo + KERNEL_BLOCK
+        used = np.minimum(digits[lo:hi], 9)
+        width = 19 + int(used.max())
+        cols = np.minimum(offsets[lo:hi, None] + np.arange(width), len(arr) - 1)
+        d = arr[cols].astype(np.int64) - ord("0")
+
+        year = d[:, 1] * 1000 + d[:, 2] * 100 + d[:, 3] * 10 + d[:, 4]
+        month = d[:, 5] * 10 + d[:, 6]
+        day = d[:, 7] * 10 + d[:, 8]
+        hour = d[:, 10] * 10 + d[:, 11]
+        minute = d[:, 13] * 10 + d[:, 14]
+        second = d[:, 16] * 10 + d[:, 17]
+        fraction = d[:, 19:] * (np.arange(width - 19) < used[:, None])
+        nanos_part = fraction @ _FRACTION_SCALE[:width - 19]
+
+        leap = (year % 4 == 0) & ((year % 100 != 0) | (year % 400 == 0))
+        month_ok = (month >= 1) & (month <= 12)
+        last_day = _DAYS_IN_MONTH[np.where(month_ok, month - 1, 0)] + (leap & (month == 2))
+        valid[lo:hi] = (
+            month_ok & (day >= 1) & (day <= last_day)
+            & (hour < 24) & (minute < 60) & (second < 60)
+            & (digits[lo:hi] <= 9)
+            & (year >= KERNEL_YEARS[0]) & (year <= KERNEL_YEARS[1])
+        )
+
+        # Days since 1970-01-01 for the proleptic Gregorian calendar
+        y = year - (month <= 2)
+        era = y // 400
+        yoe = y - era * 400
+        doy = (153 * ((month + 9) % 12) + 2) // 5 + day - 1
+        days = era * 146097 + yoe * 365 + yoe // 4 - yoe // 100 + doy - 719468
+        seconds = days * 86400 + hour * 3600 + minute * 60 + second
+        nanos[lo:hi] = seconds * 1_000_000_000 + nanos_part
+    return nanos, valid
+
+
+def stamp_column(nanos, digits, valid):
+    """
+    Build a datetime column from decoded stamps, with NaT where `valid` is
+    False. The resolution matches what pandas infers for the same text:
+    finer when any stamp has more than six fraction digits.
+    """
+    long = bool((np.asarray(digits)[valid] > 6).any())
+    values = nanos.astype("datetime64[ns]")
+    values[~valid] = np.datetime64("NaT")
+    return values.astype(f"datetime64[{_string_unit(long)}]")
+
+
+@lru_cache(maxsize=None)
+def _string_unit(long):
+    """Resolution pandas picks when parsing TSMC stamps with long or short fractions."""
+    sample = "20240101 00:00:00." + ("1234567" if long else "1")
+    parsed = pd.to_datetime(pd.Series([sample]), format=TSMC_STAMP_FORMAT)
+    return np.datetime_data(parsed.dtype)[0]
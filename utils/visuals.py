@@ -6,6 +6,12 @@ import plotly.graph_objects as go
 from PIL import Image, ImageDraw, ImageFont
 
 
+def _observed(df: pd.DataFrame):
+    """Drop categories no row of `df` uses (left over after filtering)."""
+    columns = {col: df[col].cat.remove_unused_categories() for col in df.columns if isinstance(df[col].dtype, pd.CategoricalDtype)}
+    return df.assign(**columns) if columns else df
+
+
 def plot_timeline(df: pd.DataFrame):
     """Plot a timeline of alarms as a Plotly scatter chart."""
     if df.empty or "Raise Date" not in df.columns or "Alarm Name" not in df.columns:
@@ -18,6 +24,7 @@ def plot_timeline(df: pd.DataFrame):
         )
         return fig
 
+    df = _observed(df)
     fig = px.scatter(
         df,
         x="Raise Date",
@@ -42,7 +49,7 @@ def plot_counts(df: pd.DataFrame):
         )
         return fig
 
-    counts = df["Alarm Name"].value_counts().reset_index()
+    counts = _observed(df[["Alarm Name"]])["Alarm Name"].value_counts().reset_index()
     counts.columns = ["Alarm Name", "Count"]
 
     fig = px.bar(